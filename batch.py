@@ -0,0 +1,152 @@
+"""Run seeded auto-pilot episodes headless across a process pool.
+
+Each episode is a fresh engine.SnakeEngine on its own seed, driven by the
+auto-pilot until it gets stuck (no path to the food), clears the board or
+hits --max-steps. Every episode is its own task on a ProcessPoolExecutor
+and is streamed as one JSON line (to stdout, or --out) as soon as it
+finishes; a summary per mode is printed at the end:
+
+    python batch.py --episodes 1000
+    python batch.py --modes maze --planners "D* Lite" --workers 8 --out runs.jsonl
+
+--telemetry adds the auto-pilot's search totals (telemetry.SearchStats:
+searches, failures, nodes expanded, open-set peak) to every episode, and
+--record DIR saves every episode as a replay (replay.py) to watch or
+re-simulate later.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import engine
+from engine import SnakeEngine
+from replay import Recorder
+from telemetry import SearchStats
+
+
+def run_episode(seed, mode="normal", cols=30, rows=20, planner=engine.PLANNER_NAMES[0],
+                maze_style=engine.MAZE_STYLES[0], max_steps=5000, telemetry=False, record=None):
+    """Play one episode; returns a JSON-ready dict of what happened.
+
+    Getting stuck ends the episode in both modes. Maze play starts a new
+    maze then, and normal mode, which never ends by itself, steers blindly
+    right through the snake's own body, so nothing after it says anything
+    about the planner.
+    """
+    t0 = time.perf_counter()
+    e = SnakeEngine(cols, rows, seed=seed, planner=planner, maze_style=maze_style)
+    if mode == "maze":
+        e.set_puzzle_mode(True)
+    stats = None
+    if telemetry:
+        stats = SearchStats()
+        e.set_search_stats(stats)
+    recorder = Recorder(e) if record else None
+    e.events.clear()
+    eaten = steps = 0
+    outcome = "timeout"
+    while steps < max_steps and outcome == "timeout":
+        e.step()
+        steps += 1
+        for kind, _ in e.events:
+            if kind == engine.EAT:
+                eaten += 1
+            elif kind == engine.CLEARED:
+                outcome = "cleared"
+            elif kind == engine.STUCK:
+                outcome = "stuck"
+        e.events.clear()
+        if e.food is None:
+            outcome = "cleared"  # normal mode: the snake fills the board
+    result = {
+        "seed": seed, "mode": mode, "planner": planner,
+        "maze_style": maze_style if mode == "maze" else None,
+        "score": eaten, "steps": steps,
+        "steps_per_food": steps / eaten if eaten else None,
+        "outcome": outcome, "seconds": time.perf_counter() - t0,
+    }
+    if stats is not None:
+        # close() ends the game in stats, unless clearing a maze or getting
+        # stuck in one has already restarted the engine and ended it there
+        e.close()
+        result["search"] = stats.last
+    if recorder is not None:
+        name = f"{mode}-{planner.replace('*', 'star').replace(' ', '')}-{seed}.replay"
+        result["replay"] = recorder.save(os.path.join(record, name))
+    return result
+
+
+def summarize(results):
+    """Aggregate statistics over a list of episode dicts."""
+    scores = [r["score"] for r in results]
+    spf = [r["steps_per_food"] for r in results if r["steps_per_food"] is not None]
+    n = len(results)
+    return {
+        "episodes": n,
+        "score_mean": statistics.fmean(scores),
+        "score_median": statistics.median(scores),
+        "score_max": max(scores),
+        "steps_per_food": statistics.fmean(spf) if spf else None,
+        "stuck_rate": sum(r["outcome"] == "stuck" for r in results) / n,
+        "cleared_rate": sum(r["outcome"] == "cleared" for r in results) / n,
+        "steps": sum(r["steps"] for r in results),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--episodes", type=int, default=200, help="episodes per mode and planner")
+    ap.add_argument("--modes", nargs="+", default=["normal", "maze"], choices=["normal", "maze"])
+    ap.add_argument("--planners", nargs="+", default=[engine.PLANNER_NAMES[0]], choices=engine.PLANNER_NAMES)
+    ap.add_argument("--maze-style", default=engine.MAZE_STYLES[0], choices=engine.MAZE_STYLES)
+    ap.add_argument("--size", default="30x20")
+    ap.add_argument("--max-steps", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0, help="first episode seed")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--out", help="write the per-episode JSON lines here instead of stdout")
+    ap.add_argument("--telemetry", action="store_true", help="add planner search totals to every episode")
+    ap.add_argument("--record", metavar="DIR", help="save a replay of every episode in this directory")
+    args = ap.parse_args()
+
+    cols, rows = map(int, args.size.split("x"))
+    jobs = [dict(seed=args.seed + i, mode=mode, cols=cols, rows=rows, planner=planner,
+                 maze_style=args.maze_style, max_steps=args.max_steps, telemetry=args.telemetry,
+                 record=args.record)
+            for mode in args.modes for planner in args.planners for i in range(args.episodes)]
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    groups = {}
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # one task per episode: an episode takes milliseconds to seconds, so
+        # the pickling per task is noise and results stream as they finish
+        for fut in as_completed([pool.submit(run_episode, **job) for job in jobs]):
+            r = fut.result()
+            out.write(json.dumps(r) + "\n")
+            out.flush()
+            groups.setdefault((r["mode"], r["planner"]), []).append(r)
+    wall = time.perf_counter() - t0
+    if out is not sys.stdout:
+        out.close()
+
+    log = sys.stderr
+    print(f"{len(jobs)} episodes on {args.workers} workers in {wall:.1f} s "
+          f"({len(jobs) / wall:.1f} episodes/s)", file=log)
+    print(f"{'mode':>7} {'planner':>8} {'eps':>5} {'score':>7} {'median':>6} {'max':>5} "
+          f"{'steps/food':>10} {'stuck':>6} {'cleared':>7} {'steps/s':>9}", file=log)
+    for (mode, planner), results in groups.items():
+        s = summarize(results)
+        spf = f"{s['steps_per_food']:10.1f}" if s["steps_per_food"] is not None else f"{'-':>10}"
+        rate = s["steps"] / sum(r["seconds"] for r in results)
+        print(f"{mode:>7} {planner:>8} {s['episodes']:>5} {s['score_mean']:7.1f} {s['score_median']:6.1f} "
+              f"{s['score_max']:>5} {spf} {s['stuck_rate']:6.1%} {s['cleared_rate']:7.1%} {rate:9.0f}", file=log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare the old min()-scan A* with the grid/heap A* in pathfinding.py.
+
+Run from the repository root:
+
+    python benchmarks/bench_astar.py
+    python benchmarks/bench_astar.py --sizes 30x20 120x80 --density 0.25
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pathfinding
+from grid import Grid
+
+
+def neighbors(cell, cols, rows):
+    x, y = cell
+    for dx, dy in pathfinding.DIRS:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < cols and 0 <= ny < rows:
+            yield (nx, ny)
+
+
+def a_star_scan(start, goal, blocked, cols, rows):
+    """The original implementation: linear min() over the open set."""
+    if start == goal:
+        return []
+    open_set = {start}
+    came = {}
+    g = {start: 0}
+    f = {start: abs(start[0]-goal[0]) + abs(start[1]-goal[1])}
+    while open_set:
+        cur = min(open_set, key=lambda c: f.get(c, 10**9))
+        if cur == goal:
+            path = []
+            while cur in came:
+                path.append(cur)
+                cur = came[cur]
+            path.reverse()
+            return path
+        open_set.remove(cur)
+        for n in neighbors(cur, cols, rows):
+            if n in blocked:
+                continue
+            tg = g[cur] + 1
+            if tg < g.get(n, 10**9):
+                came[n] = cur
+                g[n] = tg
+                f[n] = tg + abs(n[0]-goal[0]) + abs(n[1]-goal[1])
+                open_set.add(n)
+    return None
+
+
+def scenario(grid, density, rng):
+    """Random wall noise with a guaranteed corner-to-corner path."""
+    cols, rows = grid.cols, grid.rows
+    start, goal = (0, 0), (cols - 1, rows - 1)
+    while True:
+        blocked = set()
+        for _ in range(int(cols * rows * density)):
+            blocked.add((rng.randrange(cols), rng.randrange(rows)))
+        blocked.discard(start)
+        blocked.discard(goal)
+        mask = grid.mask(blocked)
+        if pathfinding.a_star(grid, start, goal, mask):
+            return start, goal, blocked, mask
+
+
+def timeit(fn, args, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", nargs="+", default=["30x20", "60x40", "120x80", "240x160"])
+    ap.add_argument("--density", type=float, default=0.25)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--scan-limit", type=int, default=20000,
+                    help="skip the min()-scan version above this many cells")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'grid':>10} {'cells':>8} {'scan ms':>10} {'grid ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        cols, rows = map(int, size.split("x"))
+        grid = Grid(cols, rows)
+        start, goal, blocked, mask = scenario(grid, args.density, rng)
+        t_heap, p_heap = timeit(pathfinding.a_star, (grid, start, goal, mask), args.repeat)
+        if cols * rows <= args.scan_limit:
+            t_scan, p_scan = timeit(a_star_scan, (start, goal, blocked, cols, rows), args.repeat)
+            assert len(p_scan) == len(p_heap)
+            scan_ms, speedup = f"{t_scan*1000:10.2f}", f"{t_scan/t_heap:7.1f}x"
+        else:
+            scan_ms, speedup = f"{'skipped':>10}", f"{'-':>8}"
+        print(f"{size:>10} {cols*rows:>8} {scan_ms} {t_heap*1000:10.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Time the auto-pilot planners in pathfinding.PLANNERS over simulated games.
+
+Each planner drives the same seeded board (random walls, fresh snake) until
+it has eaten --foods pieces of food, with the same occupancy bookkeeping as
+the games. Run from the repository root:
+
+    python benchmarks/bench_planners.py
+    python benchmarks/bench_planners.py --sizes 200x200 --foods 5 --planners A* Field
+    python benchmarks/bench_planners.py --wrap --density 0
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pathfinding
+from grid import Grid, Occupancy
+
+
+def make_walls(grid, density, rng):
+    walls = bytearray(grid.size)
+    for _ in range(int(grid.size * density)):
+        walls[rng.randrange(grid.size)] = 1
+    return walls
+
+
+def play(grid, walls, planner, foods, seed, max_ticks):
+    """Run the auto-pilot until `foods` are eaten; returns (ticks, eaten, seconds in planner)."""
+    rng = random.Random(seed)
+    occ = Occupancy(grid)
+    start = grid.index((grid.cols // 4, grid.rows // 2))
+    walls[start] = 0
+    snake = deque([start])
+    occ.reset([grid.cell(start)], walls=walls)
+    food = occ.free.choice(rng)
+    eaten = ticks = 0
+    spent = 0.0
+    while eaten < foods and ticks < max_ticks:
+        ticks += 1
+        blocked = occ.except_tail(snake[-1])
+        t0 = time.perf_counter()
+        nxt = planner.next_step(snake[0], food, blocked)
+        spent += time.perf_counter() - t0
+        if nxt < 0:
+            break
+        snake.appendleft(nxt)
+        occ.push(nxt)
+        tail = -1
+        if nxt == food:
+            eaten += 1
+            food = occ.free.choice(rng)
+            if food < 0:
+                break
+        else:
+            tail = snake.pop()
+            occ.pop(tail)
+        planner.cells_changed(nxt, tail)
+    return ticks, eaten, spent
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", nargs="+", default=["30x20", "200x200", "1000x1000"])
+    ap.add_argument("--planners", nargs="+", default=list(pathfinding.PLANNERS))
+    ap.add_argument("--density", type=float, default=0.2)
+    ap.add_argument("--foods", type=int, default=10)
+    ap.add_argument("--max-ticks", type=int, default=20000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--wrap", action="store_true", help="plan on a torus like normal mode")
+    args = ap.parse_args()
+
+    print(f"{'grid':>10} {'planner':>8} {'ticks':>6} {'eaten':>5} {'total ms':>10} {'us/tick':>9}")
+    for size in args.sizes:
+        cols, rows = map(int, size.split("x"))
+        grid = Grid(cols, rows)
+        walls = make_walls(grid, args.density, random.Random(args.seed))
+        for name in args.planners:
+            planner = pathfinding.PLANNERS[name](grid, wrap=args.wrap)
+            ticks, eaten, spent = play(grid, bytearray(walls), planner, args.foods, args.seed, args.max_ticks)
+            print(f"{size:>10} {name:>8} {ticks:>6} {eaten:>5} {spent*1000:10.1f} {spent/max(ticks, 1)*1e6:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Steps per second of vecenv.VecSnakeEnv under random actions.
+
+Run from the repository root:
+
+    python benchmarks/bench_vecenv.py
+    python benchmarks/bench_vecenv.py --envs 256 4096 --maze
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vecenv import VecSnakeEnv
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--envs", nargs="+", type=int, default=[1, 64, 1024, 8192])
+    ap.add_argument("--size", default="30x20")
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--maze", action="store_true", help="maze play instead of normal mode")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    cols, rows = map(int, args.size.split("x"))
+    print(f"{'envs':>6} {'steps':>6} {'seconds':>8} {'M steps/s':>10} {'food':>7}")
+    for n in args.envs:
+        env = VecSnakeEnv(n, cols, rows, maze_mode=args.maze, seed=args.seed)
+        actions = np.random.default_rng(args.seed).integers(0, 4, (args.steps, n))
+        food = 0.0
+        t0 = time.perf_counter()
+        for a in actions:
+            reward, _ = env.step(a)
+            food += reward.sum()
+        dt = time.perf_counter() - t0
+        print(f"{n:>6} {args.steps:>6} {dt:8.3f} {n * args.steps / dt / 1e6:10.2f} {int(food):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Reproducible pathfinding and maze-generation benchmark suite.
+
+Every scenario is rebuilt from --seed, so two runs (or two versions of the
+code) measure exactly the same boards:
+
+    open      no walls, route from (1, 1) to the far corner
+    coiled    a snake coiled over the top half of the board, head at the
+              end of the coil, food in the far corner
+    <style>   a maze from maze.generate() for each style in maze.STYLES,
+              walked from its start to its goal
+
+Each planner in pathfinding.PLANNERS walks the route with the same
+occupancy bookkeeping as the games (maze-play rules, no wrap), and each
+maze generator builds its maze. For every run the suite reports wall time
+(best of --repeat), nodes expanded and the open set's peak size (a
+telemetry.SearchStats on the planner or generator) and peak memory
+allocated during the run (tracemalloc, separate run). Results print as a
+table and, with --out, are saved as JSON; --compare prints each result
+against a saved file:
+
+    python benchmarks/suite.py --sizes 30x20 200x200 --out base.json
+    python benchmarks/suite.py --sizes 30x20 200x200 --compare base.json
+    python benchmarks/suite.py --sizes 2000x2000 --repeat 1 --planners A* Field
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import maze
+import pathfinding
+from grid import Grid, Occupancy
+from telemetry import SearchStats
+
+SCENARIOS = ["open", "coiled"] + list(maze.STYLES)
+
+
+# ---------------------------
+# Scenarios
+# ---------------------------
+def coil(grid):
+    """Cell indices of a snake zig-zagging over the top half, head first."""
+    cols = grid.cols
+    body = []
+    for y in range(grid.rows // 2):
+        row = range(y * cols, (y + 1) * cols)
+        body.extend(row if y % 2 == 0 else reversed(row))
+    body.reverse()
+    return body
+
+
+def scenario(name, grid, seed):
+    """(walls, snake, goal) for a scenario: wall mask, body head first, goal cell."""
+    start = grid.index((1, 1))
+    goal = grid.index((grid.cols - 2, grid.rows - 2))
+    if name == "open":
+        return bytearray(grid.size), [start], goal
+    if name == "coiled":
+        return bytearray(grid.size), coil(grid), goal
+    m = maze.generate(name, grid, start, goal, seed)
+    return m.walls, [start], goal
+
+
+# ---------------------------
+# Runs
+# ---------------------------
+def route(grid, name, walls, snake, goal):
+    """Set up planner `name` on a board; returns a callable that walks it to goal."""
+    occ = Occupancy(grid)
+    occ.reset([grid.cell(i) for i in snake], walls=walls)
+    snake = deque(snake)
+    planner = pathfinding.PLANNERS[name](grid)
+    planner.stats = stats = SearchStats()
+
+    def run():
+        steps = 0
+        while snake[0] != goal:
+            tail = snake[-1]
+            nxt = planner.next_step(snake[0], goal, occ.except_tail(tail))
+            if nxt < 0:
+                break
+            snake.appendleft(nxt)
+            occ.push(nxt)
+            occ.pop(snake.pop())
+            planner.cells_changed(nxt, tail)
+            steps += 1
+        return {"expanded": stats.expanded, "open_peak": stats.open_peak, "steps": steps,
+                "reached": snake[0] == goal}
+    return run
+
+
+def generation(grid, style, seed):
+    """A callable that builds one maze of `style` from seed."""
+    start = grid.index((1, 1))
+    goal = grid.index((grid.cols - 2, grid.rows - 2))
+
+    def run():
+        stats = SearchStats()
+        m = maze.generate(style, grid, start, goal, seed, stats)
+        return {"expanded": stats.expanded, "open_peak": stats.open_peak, "attempts": m.attempts,
+                "path": len(m.path)}
+    return run
+
+
+def measure(setup, repeat):
+    """Best wall time of `repeat` fresh runs, then one more run under tracemalloc.
+
+    setup() builds the state outside the measurement and returns the run
+    callable; returns (result of the last run, seconds, peak bytes).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        run = setup()
+        t0 = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - t0)
+    run = setup()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def key(r):
+    return f"{r['kind']}/{r['scenario']}/{r['size']}/{r['name']}"
+
+
+def row(r, base=None):
+    detail = (f"{r['steps']} steps" + ("" if r["reached"] else " (cut off)") if r["kind"] == "planner"
+              else f"{r['attempts']} tries, path {r['path']}")
+    line = (f"{r['scenario']:>12} {r['size']:>10} {r['name']:>12} {r['ms']:10.2f} "
+            f"{r['expanded']:>10} {r['open_peak']:>9} {r['peak_kib']:9.0f}  {detail}")
+    if base is not None:
+        line += f"  | {r['ms'] / max(base['ms'], 1e-9):5.2f}x time, {r['expanded'] - base['expanded']:+d} nodes"
+    return line
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", nargs="+", default=["30x20", "200x200", "1000x1000"],
+                    help="e.g. 2000x2000 too (D* Lite needs over a minute per route there)")
+    ap.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    ap.add_argument("--planners", nargs="+", default=list(pathfinding.PLANNERS), choices=list(pathfinding.PLANNERS))
+    ap.add_argument("--styles", nargs="+", default=list(maze.STYLES), choices=list(maze.STYLES),
+                    help="maze generators to time")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, best is kept")
+    ap.add_argument("--out", help="write the results here as JSON")
+    ap.add_argument("--compare", help="JSON from an earlier --out to compare against")
+    args = ap.parse_args()
+
+    base = {}
+    if args.compare:
+        with open(args.compare) as f:
+            base = {key(r): r for r in json.load(f)["results"]}
+
+    results = []
+    print(f"{'scenario':>12} {'grid':>10} {'name':>12} {'ms':>10} {'expanded':>10} {'open peak':>9} {'peak KiB':>9}")
+
+    def report(r, ms, peak):
+        r.update(ms=ms * 1000, peak_kib=peak / 1024)
+        results.append(r)
+        print(row(r, base.get(key(r))), flush=True)
+
+    for size in args.sizes:
+        cols, rows = map(int, size.split("x"))
+        grid = Grid(cols, rows)
+        for style in args.styles:
+            out, secs, peak = measure(lambda: generation(grid, style, args.seed), args.repeat)
+            report(dict(kind="maze", scenario="generate", size=size, name=style, seed=args.seed, **out),
+                   secs, peak)
+        for name in args.scenarios:
+            walls, snake, goal = scenario(name, grid, args.seed)
+            for planner in args.planners:
+                out, secs, peak = measure(lambda: route(grid, planner, walls, snake, goal), args.repeat)
+                report(dict(kind="planner", scenario=name, size=size, name=planner, seed=args.seed, **out),
+                       secs, peak)
+
+    if args.out:
+        meta = {
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "args": vars(args),
+        }
+        with open(args.out, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Headless snake / maze simulation behind game.py and "most advance.py".
+
+Nothing here imports pygame. SnakeEngine owns the board, snake, food, maze
+and auto-pilot, and step() advances one tick as fast as the CPU allows, so
+games can run on a server without a display. The front-ends only draw its
+state and turn the events it reports into sound and particles.
+"""
+import random
+import time
+from collections import deque
+
+import maze
+import pathfinding
+from grid import Grid, Occupancy
+
+PLANNER_NAMES = list(pathfinding.PLANNERS)
+MAZE_STYLES = list(maze.STYLES)
+
+# events, reported as (kind, cell) tuples in SnakeEngine.events
+MOVE = "move"        # the snake moved; cell is the head it left (trail)
+EAT = "eat"          # cell is where the food was eaten
+WRAP = "wrap"        # normal mode: the head crossed the board edge
+BLOCKED = "blocked"  # maze play: manual move into a wall or off the board
+NEW_MAZE = "maze"    # a maze was generated, see SnakeEngine.maze
+CLEARED = "cleared"  # maze play: no free cell left, a new maze was started
+STUCK = "stuck"      # the auto-pilot found no path to the food
+
+
+class SnakeEngine:
+    """Game state and rules of normal mode and maze play.
+
+    Cells are (x, y) tuples and snake[0] is the head. Normal mode wraps
+    around the edges and never ends; maze play is walled in and starts a
+    new maze when the auto-pilot is cut off or the board fills up. Every
+    call appends what happened to `events`, which the caller drains.
+
+    With `seed` set, food and maze seeds all come from one random.Random,
+    so a run can be reproduced exactly. pool_depth > 0 instead keeps that
+    many mazes pre-generated on a worker (maze.MazePool), for the games.
+    Setting `profiler` (a profiler.Profiler) books the auto-pilot's and the
+    maze generation's time to its "plan" and "maze" phases, and
+    set_search_stats() collects the auto-pilot's per-search telemetry. A
+    `recorder` (replay.Recorder) is told every move, food placement, maze
+    and restart, which is all a replay needs.
+    """
+
+    def __init__(self, cols=30, rows=20, seed=None, planner=PLANNER_NAMES[0],
+                 maze_style=MAZE_STYLES[0], pool_depth=0):
+        self.cols = cols
+        self.rows = rows
+        self.board = board = Grid(cols, rows)
+        self.occ = Occupancy(board)  # snake (and maze walls) per cell
+        self.rng = random.Random(seed)
+        self.events = []
+        self.profiler = None
+        self.recorder = None
+        self.search_stats = None  # telemetry.SearchStats, see set_search_stats()
+
+        self.snake = deque()
+        self.moves = 0  # heads pushed so far; moves - i stays with snake[i] as it moves
+        self.restarts = 0  # snake replaced wholesale (_restart, replay seeks)
+        self.food = None
+        self.score = 0
+        self.manual_dir = None
+        self.auto_mode = True
+        self.puzzle_mode = False
+
+        self.planner_name = planner
+        self.planner = self._make_planner()
+
+        self.maze_walls = board.walls
+        self.maze_start = (1, 1)
+        self.maze_goal = (cols - 2, rows - 2)
+        self.maze_path = []
+        self.maze_style = maze_style
+        self.maze = None  # last maze.Maze (seed, attempts, seconds)
+        self.maze_pool = None
+        if pool_depth:
+            self.maze_pool = maze.MazePool(board, board.index(self.maze_start), board.index(self.maze_goal),
+                                           maze_style, depth=pool_depth)
+        self.reset_normal()
+
+    def close(self):
+        self._end_game()
+        if self.maze_pool is not None:
+            self.maze_pool.close()
+
+    # ---------------------------
+    # Auto-pilot
+    # ---------------------------
+    def _make_planner(self):
+        # normal mode wraps around the edges, so its planner works on a torus
+        planner = pathfinding.PLANNERS[self.planner_name](self.board, wrap=not self.puzzle_mode)
+        planner.stats = self.search_stats
+        return planner
+
+    def set_planner(self, name):
+        self.planner_name = name
+        self.planner = self._make_planner()
+
+    def cycle_planner(self):
+        i = PLANNER_NAMES.index(self.planner_name)
+        self.set_planner(PLANNER_NAMES[(i + 1) % len(PLANNER_NAMES)])
+
+    def set_search_stats(self, stats):
+        """Report every auto-pilot search to stats (a telemetry.SearchStats, or None).
+
+        Each restart (reset, new maze, mode switch) closes a game in stats,
+        with the mode, planner, score and snake length it ended on.
+        """
+        self.search_stats = stats
+        self.planner.stats = stats
+
+    def _end_game(self):
+        if self.search_stats is not None:
+            self.search_stats.end_game(mode="maze" if self.puzzle_mode else "normal", planner=self.planner_name,
+                                       score=self.score, length=len(self.snake))
+
+    def auto_next(self, head, blocked):
+        """Next cell towards food, or None if there is no food or no path."""
+        if self.food is None:
+            return None
+        board = self.board
+        if self.profiler is None:
+            i = self.planner.next_step(board.index(head), board.index(self.food), blocked)
+        else:
+            t0 = time.perf_counter()
+            i = self.planner.next_step(board.index(head), board.index(self.food), blocked)
+            self.profiler.add("plan", time.perf_counter() - t0)
+        return board.cell(i) if i >= 0 else None
+
+    # ---------------------------
+    # Board bookkeeping
+    # ---------------------------
+    def place_food(self):
+        # O(1) pick from the free-cell index kept by occ; None when the board is full
+        i = self.occ.free.choice(self.rng)
+        if self.recorder is not None:
+            self.recorder.food(i)
+        return self.board.cell(i) if i >= 0 else None
+
+    # every body move goes through these so occupancy and planner stay in sync
+    def push_head(self, cell):
+        self.snake.appendleft(cell)
+        self.moves += 1
+        i = self.board.index(cell)
+        self.occ.push(i)
+        self.planner.cells_changed(i)
+
+    def pop_tail(self):
+        i = self.board.index(self.snake.pop())
+        self.occ.pop(i)
+        self.planner.cells_changed(i)
+
+    def _restart(self, snake, walls=None):
+        self._end_game()
+        if self.recorder is not None:
+            self.recorder.restart(self.puzzle_mode)
+        self.snake.clear()
+        self.snake.extend(snake)
+        self.restarts += 1
+        self.score = 0
+        self.manual_dir = None
+        self.occ.reset(self.snake, walls=walls)
+        self.food = self.place_food()
+        self.planner.clear()
+        self.planner.reset_stats()
+
+    def reset_normal(self):
+        cols, rows = self.cols, self.rows
+        self._restart([(cols//4, rows//2), (cols//4-1, rows//2), (cols//4-2, rows//2)])
+
+    # ---------------------------
+    # Maze play
+    # ---------------------------
+    def generate_maze(self, seed=None):
+        """Install a solvable maze; the same style and seed give the same maze."""
+        board = self.board
+        t0 = time.perf_counter()
+        if seed is None and self.maze_pool is not None:
+            m = self.maze_pool.take(self.maze_style)  # ready-made, refilled in the background
+        else:
+            if seed is None:
+                seed = self.rng.randrange(2**32)
+            m = maze.generate(self.maze_style, board, board.index(self.maze_start), board.index(self.maze_goal), seed)
+        if self.profiler is not None:
+            self.profiler.add("maze", time.perf_counter() - t0)
+        self.install_maze(m)
+        return m
+
+    def install_maze(self, m):
+        """Put maze m (a maze.Maze) on the board; the snake is placed by setup_maze_play()."""
+        self.maze_walls[:] = m.walls
+        self.maze_path = [self.board.cell(i) for i in m.path]
+        self.maze = m
+        if self.recorder is not None:
+            self.recorder.maze(m, self.maze_style)
+        self.events.append((NEW_MAZE, None))
+
+    def setup_maze_play(self):
+        sx, sy = self.maze_start
+        snake = [(sx, sy)]
+        # small trailing segment, unless a wall is in the way
+        if sx+1 < self.cols and not self.maze_walls[self.board.index((sx+1, sy))]:
+            snake.append((sx+1, sy))
+        self._restart(snake, walls=self.maze_walls)
+
+    def new_maze(self):
+        self.generate_maze()
+        self.setup_maze_play()
+
+    # ---------------------------
+    # Controls
+    # ---------------------------
+    def set_puzzle_mode(self, on):
+        self._end_game()
+        self.puzzle_mode = on
+        self.planner = self._make_planner()
+        if on:
+            self.new_maze()
+        else:
+            self.reset_normal()
+
+    def reset(self):
+        """R: a new maze in maze play, a fresh snake in normal mode."""
+        if self.puzzle_mode:
+            self.new_maze()
+        else:
+            self.reset_normal()
+
+    def cycle_maze_style(self):
+        i = MAZE_STYLES.index(self.maze_style)
+        self.maze_style = MAZE_STYLES[(i + 1) % len(MAZE_STYLES)]
+        if self.puzzle_mode:
+            self.new_maze()
+
+    def steer(self, direction):
+        self.manual_dir = direction
+
+    # ---------------------------
+    # Simulation
+    # ---------------------------
+    def step(self):
+        """Advance one tick in the current mode."""
+        if self.puzzle_mode:
+            # ensure food exists in maze
+            if self.food is None:
+                self.food = self.place_food()
+                if self.food is None:
+                    self.new_maze()
+            self._step_maze()
+        else:
+            if self.food is None:
+                self.food = self.place_food()
+            self._step_normal()
+
+    def _step_normal(self):
+        """Normal world: wrapping allowed (immortal)."""
+        cols, rows = self.cols, self.rows
+        hx, hy = self.snake[0]
+
+        if self.auto_mode:
+            blocked = self.occ.except_tail(self.board.index(self.snake[-1]))  # allow stepping into tail
+            nxt = self.auto_next((hx, hy), blocked)
+            if nxt is not None:
+                wrapped = abs(nxt[0] - hx) > 1 or abs(nxt[1] - hy) > 1
+            else:
+                self.events.append((STUCK, (hx, hy)))
+                nxt = ((hx + 1) % cols, hy)
+                wrapped = hx + 1 == cols
+        else:
+            dx, dy = self.manual_dir or (1, 0)
+            nxt = ((hx + dx) % cols, (hy + dy) % rows)
+            wrapped = nxt != (hx + dx, hy + dy)
+
+        self.move(nxt)
+        if wrapped:
+            self.events.append((WRAP, nxt))
+
+    def _step_maze(self):
+        """Maze play: no wrapping, walls block movement."""
+        hx, hy = self.snake[0]
+
+        if self.auto_mode:
+            blocked = self.occ.except_tail(self.board.index(self.snake[-1]))
+            nxt = self.auto_next((hx, hy), blocked)
+            if nxt is None:
+                # regenerate if path disappeared
+                self.events.append((STUCK, (hx, hy)))
+                self.new_maze()
+                return
+        else:
+            if self.manual_dir is None:
+                return  # don't move until the player picks a direction
+            dx, dy = self.manual_dir
+            nxt = (hx + dx, hy + dy)
+            if not (0 <= nxt[0] < self.cols and 0 <= nxt[1] < self.rows) or self.maze_walls[self.board.index(nxt)]:
+                self.events.append((BLOCKED, nxt))
+                return
+
+        if self.move(nxt) and self.food is None:
+            # completed: regenerate maze
+            self.new_maze()
+            self.events.append((CLEARED, nxt))
+
+    def move(self, nxt):
+        """Push the head to nxt and eat or drop the tail; True if food was eaten."""
+        if self.recorder is not None:
+            self.recorder.move(self.snake[0], nxt)
+        self.events.append((MOVE, self.snake[0]))
+        self.push_head(nxt)
+        if nxt == self.food:
+            self.events.append((EAT, nxt))
+            self.score += 1
+            self.food = self.place_food()
+            return True
+        self.pop_tail()
+        return False
@@ -0,0 +1,65 @@
+"""Engine set-up, fixed-step timing and teardown shared by the pygame front-ends.
+
+game.py and "most advance.py" look and sound different but run the same
+thing: a SnakeEngine with mazes generated ahead on a worker, the auto-pilot's
+search telemetry streamed to the file SNAKE_TELEMETRY names, and the whole
+session recorded so F5 can save it as a replay. Session builds that set and
+tears it down again; FixedStep turns frame times into simulation steps.
+"""
+import os
+
+from engine import SnakeEngine
+from replay import Recorder
+from telemetry import JsonlSink, SearchStats
+
+MAZE_POOL_DEPTH = 3  # mazes generated ahead in the background for R / M / G
+MAX_STEPS_PER_FRAME = 64  # catch-up limit, so a slow frame can't snowball
+
+
+class Session:
+    """A front-end's engine together with its telemetry sink and replay recorder."""
+
+    def __init__(self, cols, rows, pool_depth=MAZE_POOL_DEPTH):
+        self.engine = SnakeEngine(cols, rows, pool_depth=pool_depth)
+        # per-search planner telemetry (nodes expanded, open-set peak, path
+        # length) with per-game totals, only when SNAKE_TELEMETRY names a file
+        self.telemetry_sink = None
+        path = os.environ.get("SNAKE_TELEMETRY")
+        if path:
+            self.telemetry_sink = JsonlSink(path)
+            self.engine.set_search_stats(SearchStats(self.telemetry_sink))
+        # every move, food and maze goes into a compact replay (2 bits a move)
+        self.recorder = Recorder(self.engine)
+
+    def close(self):
+        """Stop the maze prefetch worker, the recorder and the telemetry sink."""
+        self.recorder.detach()
+        self.engine.close()
+        if self.telemetry_sink is not None:
+            self.telemetry_sink.close()
+
+
+class FixedStep:
+    """Fixed-timestep clock: frames add their elapsed time, steps() hands it out.
+
+    Rendering is capped at the frame rate, and every frame runs however many
+    steps of 1/rate s have elapsed, so high speeds add steps rather than
+    frames.
+    """
+
+    def __init__(self):
+        self.backlog = 0.0  # elapsed seconds not simulated yet
+
+    def add(self, dt):
+        self.backlog += dt
+
+    def steps(self, rate):
+        """Whole steps of 1/rate s in the backlog, at most MAX_STEPS_PER_FRAME."""
+        step = 1.0 / rate
+        n = 0
+        while self.backlog >= step and n < MAX_STEPS_PER_FRAME:
+            self.backlog -= step
+            n += 1
+        if n == MAX_STEPS_PER_FRAME:
+            self.backlog = 0.0  # fell behind: drop the backlog instead of catching up
+        return n
@@ -0,0 +1,198 @@
+"""Flat integer-indexed board shared by pathfinding, mazes and food placement.
+
+A cell (x, y) is stored as the int y*cols + x. Everything per-cell lives in
+preallocated flat buffers so the hot loops never build or hash tuples.
+"""
+import random
+from array import array
+
+import numpy as np
+
+
+def _int_array(values):
+    a = array("i")
+    a.frombytes(np.ascontiguousarray(values, dtype=np.int32).tobytes())
+    return a
+
+
+class Grid:
+    """cols x rows board with neighbour tables and reusable search buffers."""
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.size = size = cols * rows
+
+        idx = np.arange(size, dtype=np.int32)
+        x, y = idx % cols, idx // cols
+        self.xs = _int_array(x)
+        self.ys = _int_array(y)
+
+        # 4 neighbour slots per cell in pathfinding.DIRS order, -1 = off board
+        nbr = np.full((size, 4), -1, dtype=np.int32)
+        nbr[:, 0] = np.where(x + 1 < cols, idx + 1, -1)
+        nbr[:, 1] = np.where(x > 0, idx - 1, -1)
+        nbr[:, 2] = np.where(y + 1 < rows, idx + cols, -1)
+        nbr[:, 3] = np.where(y > 0, idx - cols, -1)
+        self.nbr = _int_array(nbr)
+        # same slots on a torus (normal mode wraps around the edges)
+        nbr[:, 0] = y * cols + (x + 1) % cols
+        nbr[:, 1] = y * cols + (x - 1) % cols
+        nbr[:, 2] = (y + 1) % rows * cols + x
+        nbr[:, 3] = (y - 1) % rows * cols + x
+        self.nbr_wrap = _int_array(nbr)
+
+        border = (x == 0) | (x == cols - 1) | (y == 0) | (y == rows - 1)
+        self.border = bytes(border.astype(np.uint8))
+        self.walls = bytearray(size)
+
+        # scratch buffers for searches; a cell's g/parent are only valid when
+        # seen[cell] equals the current stamp, so nothing is cleared per call
+        self.g = array("i", bytes(4 * size))
+        self.parent = array("i", bytes(4 * size))
+        self.seen = array("I", bytes(4 * size))
+        self._stamp = 0
+
+    def index(self, cell):
+        return cell[1] * self.cols + cell[0]
+
+    def neighbours(self, wrap=False):
+        return self.nbr_wrap if wrap else self.nbr
+
+    def distance(self, a, b, wrap=False):
+        """Manhattan distance between cell indices, toroidal when wrap is set."""
+        dx = abs(self.xs[a] - self.xs[b])
+        dy = abs(self.ys[a] - self.ys[b])
+        if wrap:
+            dx = min(dx, self.cols - dx)
+            dy = min(dy, self.rows - dy)
+        return dx + dy
+
+    def cell(self, i):
+        return (self.xs[i], self.ys[i])
+
+    def next_stamp(self):
+        self._stamp += 1
+        if self._stamp == 0xFFFFFFFF:
+            self.seen = array("I", bytes(4 * self.size))
+            self._stamp = 1
+        return self._stamp
+
+    def mask(self, cells=(), walls=False):
+        """Blocked bytearray: the given (x, y) cells, plus the walls if asked."""
+        m = bytearray(self.walls) if walls else bytearray(self.size)
+        cols = self.cols
+        for x, y in cells:
+            m[y * cols + x] = 1
+        return m
+
+    def cells_of(self, mask):
+        """(x, y) tuples of the nonzero cells of a mask, for drawing."""
+        xs, ys = self.xs, self.ys
+        return [(xs[i], ys[i]) for i in np.flatnonzero(np.frombuffer(mask, dtype=np.uint8))]
+
+
+class Blocked:
+    """Read-only blocked view over a count array, without copying it.
+
+    Cell i is blocked when cells[i] > 0, except for `allow` (the snake's
+    tail, which moves away this tick), which is only blocked when something
+    else is stacked on it.
+    """
+    __slots__ = ("cells", "allow")
+
+    def __init__(self, cells, allow=-1):
+        self.cells = cells
+        self.allow = allow
+
+    def __getitem__(self, i):
+        c = self.cells[i]
+        return c > 1 if i == self.allow else c > 0
+
+
+class FreeCells:
+    """Set of free cell indices with O(1) add, remove and random choice.
+
+    cells[:n] holds the free indices in no particular order and pos[i] is
+    the slot of cell i in cells (-1 when not free); remove() swaps the last
+    free cell into the vacated slot.
+    """
+
+    def __init__(self, size):
+        self.cells = array("i", bytes(4 * size))
+        self.pos = array("i", [-1]) * size
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, i):
+        return self.pos[i] >= 0
+
+    def reset(self, counts):
+        free = np.flatnonzero(counts == 0).astype(np.int32)
+        self.n = n = len(free)
+        np.frombuffer(self.cells, dtype=np.int32)[:n] = free
+        pos = np.frombuffer(self.pos, dtype=np.int32)
+        pos[:] = -1
+        pos[free] = np.arange(n, dtype=np.int32)
+
+    def add(self, i):
+        self.cells[self.n] = i
+        self.pos[i] = self.n
+        self.n += 1
+
+    def remove(self, i):
+        p = self.pos[i]
+        self.n -= 1
+        last = self.cells[self.n]
+        self.cells[p] = last
+        self.pos[last] = p
+        self.pos[i] = -1
+
+    def choice(self, rng=random):
+        """A uniformly random free cell, or -1 when the board is full."""
+        return self.cells[rng.randrange(self.n)] if self.n else -1
+
+
+class Occupancy:
+    """Snake segment counts per cell, updated in O(1) per push/pop.
+
+    Counts rather than flags because a manually steered snake in normal mode
+    can fold over itself. Walls passed to reset() are folded in as one extra
+    count, so `blocked` covers body and walls alike. `free` indexes the
+    cells whose count is zero and follows every 0 <-> 1 transition.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.cells = array("i", bytes(4 * grid.size))
+        self.blocked = Blocked(self.cells)
+        self.free = FreeCells(grid.size)
+
+    def reset(self, snake, walls=None):
+        counts = np.frombuffer(self.cells, dtype=np.int32)
+        if walls is None:
+            counts[:] = 0
+        else:
+            counts[:] = np.frombuffer(walls, dtype=np.uint8)
+        cols, cells = self.grid.cols, self.cells
+        for x, y in snake:
+            cells[y * cols + x] += 1
+        self.free.reset(counts)
+
+    def push(self, i):
+        c = self.cells[i]
+        self.cells[i] = c + 1
+        if c == 0:
+            self.free.remove(i)
+
+    def pop(self, i):
+        c = self.cells[i] - 1
+        self.cells[i] = c
+        if c == 0:
+            self.free.add(i)
+
+    def except_tail(self, tail):
+        """Blocked view that lets the path step into the tail cell."""
+        return Blocked(self.cells, tail)
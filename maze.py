@@ -0,0 +1,290 @@
+"""Maze generation for maze mode, on the cell indices of a grid.Grid.
+
+Every generator takes (grid, start, goal, rng) and returns a Maze; use
+generate() to run one by style name from an explicit seed, so the same
+layout can be rebuilt later (e.g. to benchmark planners on it). An
+optional telemetry.SearchStats gets a "solve" record per solvability check.
+"""
+import multiprocessing
+import random
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from grid import Grid
+from pathfinding import distance_field, field_counts
+
+# walls: bytearray wall mask; path: start -> goal cell indices (excluding
+# start); attempts/seconds: what it took to get a solvable layout; seed:
+# what generate() was given (None when a generator is called directly)
+Maze = namedtuple("Maze", "walls path attempts seconds seed", defaults=(None,))
+
+
+def solve(grid, start, goal, walls, stats=None):
+    """Shortest start -> goal path through a wall mask, or None if cut off.
+
+    One vectorized flood fill from start (linear in the board) answers the
+    connectivity question, and the path is read back by walking the distance
+    field downhill from the goal.
+    """
+    dist = distance_field(grid, start, walls)
+    d = int(dist[goal])
+    if stats is not None:
+        reached, widest = field_counts(dist)
+        stats.record("solve", reached, widest, d if d >= 0 else None)
+    if d <= 0:
+        return None if d < 0 else []
+    path = [goal]
+    cur, nbr = goal, grid.nbr
+    while d > 1:
+        d -= 1
+        k = cur << 2
+        for n in nbr[k:k + 4]:
+            if n >= 0 and dist[n] == d:
+                cur = n
+                break
+        path.append(cur)
+    path.reverse()
+    return path
+
+
+def random_walls(grid, start, goal, rng=None, density=1 / 3, max_attempts=250, stats=None):
+    """Border plus random interior walls, retried until start reaches goal.
+
+    Each attempt drops size*density walls on uniformly drawn interior cells
+    (with repeats, like the original per-wall loop) in one NumPy scatter
+    and is checked with solve(). After max_attempts the maze falls back to
+    the bare border.
+    """
+    rng = np.random.default_rng(rng)
+    t0 = time.perf_counter()
+    cols, rows = grid.cols, grid.rows
+    border = np.frombuffer(grid.border, dtype=np.uint8)
+    count = int(grid.size * density)
+    for attempt in range(1, max_attempts + 1):
+        walls = border.copy()
+        if cols > 2 and rows > 2:
+            xs = rng.integers(1, cols - 1, count)
+            ys = rng.integers(1, rows - 1, count)
+            walls[ys * cols + xs] = 1
+        walls[start] = walls[goal] = 0
+        walls = bytearray(walls)
+        path = solve(grid, start, goal, walls, stats)
+        if path is not None:
+            return Maze(walls, path, attempt, time.perf_counter() - t0)
+    walls = bytearray(grid.border)
+    path = solve(grid, start, goal, walls, stats) or []
+    return Maze(walls, path, max_attempts, time.perf_counter() - t0)
+
+
+# ---------------------------
+# Perfect mazes: exactly one route between any two open cells
+# ---------------------------
+# Rooms sit on odd (x, y) and the cells between two rooms are the doors the
+# algorithms knock out. The room lattice is itself a Grid, so its neighbour
+# table drives the walks. All three loops are iterative and run on flat ints,
+# which keeps them usable on 1000x1000 boards.
+
+def _lattice(grid):
+    lat = Grid((grid.cols - 1) // 2, (grid.rows - 1) // 2)
+    rx = 2 * np.frombuffer(lat.xs, dtype=np.int32) + 1
+    ry = 2 * np.frombuffer(lat.ys, dtype=np.int32) + 1
+    return lat, ry * grid.cols + rx
+
+
+def _finish(grid, start, goal, rooms, doors, t0, stats):
+    """Open rooms and doors, hook start/goal onto the lattice, solve."""
+    walls = np.ones(grid.size, dtype=np.uint8)
+    walls[rooms] = 0
+    walls[np.asarray(doors, dtype=np.int64)] = 0
+    cols = grid.cols
+    for cell in (start, goal):
+        # an even coordinate is off the lattice: dig left/up to a room
+        x, y = cell % cols, cell // cols
+        rx, ry = x - (x % 2 == 0), y - (y % 2 == 0)
+        walls[y * cols + min(x, rx):y * cols + max(x, rx) + 1] = 0
+        walls[min(y, ry) * cols + rx:(max(y, ry) + 1) * cols:cols] = 0
+    walls = bytearray(walls)
+    return Maze(walls, solve(grid, start, goal, walls, stats) or [], 1, time.perf_counter() - t0)
+
+
+def backtracker(grid, start, goal, rng=None, stats=None):
+    """Recursive backtracker (randomized DFS) with an explicit stack."""
+    t0 = time.perf_counter()
+    rng = random.Random(rng)
+    lat, rooms = _lattice(grid)
+    nbr, visited, doors, room = lat.nbr, bytearray(lat.size), [], rooms.tolist()
+    first = rng.randrange(lat.size)
+    visited[first] = 1
+    stack = [first]
+    while stack:
+        c = stack[-1]
+        k = c << 2
+        opts = [n for n in nbr[k:k + 4] if n >= 0 and not visited[n]]
+        if not opts:
+            stack.pop()
+            continue
+        n = opts[rng.randrange(len(opts))] if len(opts) > 1 else opts[0]
+        visited[n] = 1
+        doors.append((room[c] + room[n]) >> 1)
+        stack.append(n)
+    return _finish(grid, start, goal, rooms, doors, t0, stats)
+
+
+def kruskal(grid, start, goal, rng=None, stats=None):
+    """Randomized Kruskal: shuffled lattice edges joined with union-find."""
+    t0 = time.perf_counter()
+    np_rng = np.random.default_rng(rng)
+    lat, rooms = _lattice(grid)
+    nbr = np.frombuffer(lat.nbr, dtype=np.int32).reshape(lat.size, 4)
+    cells = np.arange(lat.size, dtype=np.int32)
+    right, down = nbr[:, 0] >= 0, nbr[:, 2] >= 0
+    a = np.concatenate((cells[right], cells[down]))
+    b = np.concatenate((nbr[right, 0], nbr[down, 2]))
+    order = np_rng.permutation(len(a))
+    a, b = a[order], b[order]
+    doors_all = (rooms[a] + rooms[b]) >> 1
+
+    parent = list(range(lat.size))
+    keep = []
+    joins = lat.size - 1
+    for e, (u, v) in enumerate(zip(a.tolist(), b.tolist())):
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        if u != v:
+            parent[u] = v
+            keep.append(e)
+            joins -= 1
+            if not joins:
+                break
+    return _finish(grid, start, goal, rooms, doors_all[keep], t0, stats)
+
+
+def wilson(grid, start, goal, rng=None, stats=None):
+    """Wilson's algorithm: loop-erased random walks, a uniform spanning tree."""
+    t0 = time.perf_counter()
+    rng = random.Random(rng)
+    lat, rooms = _lattice(grid)
+    nbr, size, room = lat.nbr, lat.size, rooms.tolist()
+    in_tree = bytearray(size)
+    in_tree[rng.randrange(size)] = 1
+    step = [0] * size  # last exit taken from each cell; overwriting erases loops
+    order = list(range(size))
+    rng.shuffle(order)
+    bits = rng.getrandbits
+    doors = []
+    for c in order:
+        u = c
+        while not in_tree[u]:
+            k = u << 2
+            n = nbr[k + bits(2)]
+            while n < 0:
+                n = nbr[k + bits(2)]
+            step[u] = n
+            u = n
+        u = c
+        while not in_tree[u]:
+            in_tree[u] = 1
+            n = step[u]
+            doors.append((room[u] + room[n]) >> 1)
+            u = n
+    return _finish(grid, start, goal, rooms, doors, t0, stats)
+
+
+STYLES = {
+    "Random walls": random_walls,
+    "Backtracker": backtracker,
+    "Kruskal": kruskal,
+    "Wilson": wilson,
+}
+
+
+def generate(style, grid, start, goal, seed=None, stats=None):
+    """Run STYLES[style] from seed (a fresh random one if None)."""
+    if seed is None:
+        seed = random.randrange(2**32)
+    return STYLES[style](grid, start, goal, seed, stats=stats)._replace(seed=seed)
+
+
+# ---------------------------
+# Prefetching
+# ---------------------------
+_grids = {}
+
+
+def _build(cols, rows, start, goal, style, seed):
+    # runs on the pool's worker; one Grid per board size per process
+    grid = _grids.get((cols, rows))
+    if grid is None:
+        grid = _grids[cols, rows] = Grid(cols, rows)
+    return generate(style, grid, start, goal, seed)
+
+
+def worker():
+    """The default MazePool executor: one forked process, or a thread without fork.
+
+    The generators are mostly pure Python (the backtracker's and Wilson's
+    walks, Kruskal's union-find, the flood-fill checks), so on a thread a
+    refill holds the GIL against the frame loop in 5 ms slices: a 200x200
+    backtracker maze stretched 2 ms frames to 12 ms. A process runs them
+    beside the game instead. It has to be forked: a spawned worker would
+    re-run the game script on import and open a second window. Where fork
+    is missing (Windows) the pool falls back to the thread and its stalls,
+    a few ms per refill on the 30x20 boards the games use.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="maze")
+
+
+class MazePool:
+    """Mazes generated ahead of time on a worker and handed out on demand.
+
+    Keeps `depth` mazes of the current style queued on the executor (see
+    worker() for the default). take() returns a finished one right away,
+    only blocking when none is ready yet, and queues a replacement. Asking
+    for another style drops what was queued for the old one. The worker
+    is started here, by the first job; build the pool before anything
+    starts threads of its own (pygame.init()), so that it forks cleanly.
+    """
+
+    def __init__(self, grid, start, goal, style, depth=3, executor=None):
+        self.cols, self.rows = grid.cols, grid.rows
+        self.start, self.goal = start, goal
+        self.style = style
+        self.depth = depth
+        self.executor = executor or worker()
+        self.queue = deque()
+        self._fill()
+
+    def _fill(self):
+        while len(self.queue) < self.depth:
+            seed = random.randrange(2**32)
+            self.queue.append(self.executor.submit(
+                _build, self.cols, self.rows, self.start, self.goal, self.style, seed))
+
+    def _flush(self):
+        while self.queue:
+            self.queue.popleft().cancel()
+
+    def take(self, style=None):
+        if style is not None and style != self.style:
+            self._flush()
+            self.style = style
+            self._fill()
+        if not self.queue:  # depth 0: no prefetching
+            return _build(self.cols, self.rows, self.start, self.goal, self.style, None)
+        ready = next((f for f in self.queue if f.done()), self.queue[0])
+        self.queue.remove(ready)
+        self._fill()
+        return ready.result()
+
+    def close(self):
+        self._flush()
+        self.executor.shutdown(wait=False)
@@ -1,12 +1,45 @@
 import pygame
-import random
 import sys
 import math
 import numpy as np
-from collections import deque
+
+import engine as snake_engine
+from frontend import FixedStep, Session
+from particles import Particles
+from profiler import Profiler
+from render import BoardRenderer, DirtyRects, Hud, SpriteCache, TextPanel
+
+# ---------------------------
+# Basic config
+# ---------------------------
+BLOCK = 22
+COLS = 30
+ROWS = 20
+WIDTH, HEIGHT = COLS * BLOCK, ROWS * BLOCK
+FPS_BASE = 14  # base snake steps per second; multiplied by speed_mult
+RENDER_FPS = 60  # display frame cap, independent of the step rate
+MAX_SPEED = 48.0  # PgUp doubles speed up to here (672 steps/s)
+PARTICLE_CAPACITY = 512  # hard cap on live particles; extra ones are dropped
+SPRITE_CACHE_SIZE = 2048  # glow/particle sprites kept before LRU eviction
+PROFILE_REFRESH_MS = 250  # F3 overlay: percentiles recomputed this often
+speed_mult = 1.0
+show_profile = False
 
 # ---------------------------
-# Basic init and config
+# Game state
+# ---------------------------
+# the rules run headless in engine.SnakeEngine (no pygame there): snake,
+# food, occupancy, mazes and the auto-pilot planner. This file is the
+# front-end: it draws the engine's state and turns its events into sound
+# and particles. Maze prefetching, SNAKE_TELEMETRY and the replay F5 saves
+# come with frontend.Session, shared with game.py. The session is started
+# before pygame, so its maze worker process is forked before SDL runs any
+# threads.
+session = Session(COLS, ROWS)
+engine = session.engine
+
+# ---------------------------
+# pygame init
 # ---------------------------
 pygame.init()
 # Audio pre-init for better timing
@@ -17,13 +50,6 @@ except Exception:
     # If audio fails, continue without sound
     pass
 
-BLOCK = 22
-COLS = 30
-ROWS = 20
-WIDTH, HEIGHT = COLS * BLOCK, ROWS * BLOCK
-FPS_BASE = 14  # base frames per second; multiplied by speed_mult
-speed_mult = 1.0
-
 FONT = pygame.font.SysFont("Consolas", 18)
 
 # Colors and visual params
@@ -45,21 +71,24 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Premium Neon Snake — Maze Play")
 clock = pygame.time.Clock()
 
-# ---------------------------
-# Grid surface
-# ---------------------------
-grid_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-for x in range(0, WIDTH, BLOCK):
-    pygame.draw.line(grid_surf, GRID + (110,), (x, 0), (x, HEIGHT))
-for y in range(0, HEIGHT, BLOCK):
-    pygame.draw.line(grid_surf, GRID + (110,), (0, y), (WIDTH, y))
-# subtle checker
-for y in range(ROWS):
-    for x in range(COLS):
-        if (x + y) % 2 == 0:
-            s = pygame.Surface((BLOCK, BLOCK), pygame.SRCALPHA)
-            s.fill((255, 255, 255, 6))
-            grid_surf.blit(s, (x * BLOCK, y * BLOCK))
+# where each frame's time goes: the main loop laps its phases, the engine
+# adds its planner and maze generation time; F3 shows p50/p95/p99 over the
+# recent frames, F4 writes them to a CSV file
+profiler = Profiler(["wait", "particles", "input", "sim", "plan", "maze", "events", "draw", "present"])
+engine.profiler = profiler
+
+# dirty-rect renderer (D toggles): each frame repaints and pushes only the
+# rects drawn this frame and last frame instead of the whole window
+dirty = DirtyRects(screen)
+
+# glow, food and particle circles are pre-rendered once per (quantized)
+# size/colour/alpha and reused, so drawing a frame allocates no surfaces
+sprites = SpriteCache(SPRITE_CACHE_SIZE)
+# HUD: the status line is kept as rendered pieces (labels and values) and
+# FONT.render() only runs for a score/speed/planner value not shown before
+hud = Hud(FONT, TEXT)
+profile_panel = TextPanel(pygame.font.SysFont("Consolas", 14), TEXT)
+profile_at = -PROFILE_REFRESH_MS
 
 # ---------------------------
 # Procedural sound helpers
@@ -94,463 +123,252 @@ def play(sound):
 # ---------------------------
 # Particle system
 # ---------------------------
-import time
-class Particle:
-    def __init__(self, pos, color, size=4, speed=2.5, life=0.6):
-        self.x, self.y = pos
-        self.size = size
-        self.life = life
-        self.max_life = life
-        self.color = color
-        angle = random.random() * math.tau
-        self.vx = math.cos(angle) * speed * random.uniform(0.6, 1.2)
-        self.vy = math.sin(angle) * speed * random.uniform(0.6, 1.2)
-
-    def update(self, dt):
-        self.x += self.vx * dt * 60
-        self.y += self.vy * dt * 60
-        self.life -= dt
-        # small gravity-ish fade
-        self.vy += 0.02 * dt * 60
-
-    def draw(self, surf):
-        if self.life <= 0:
-            return
-        alpha = max(0, int(255 * (self.life / self.max_life)))
-        col = (self.color[0], self.color[1], self.color[2], alpha)
-        s = pygame.Surface((int(self.size*2), int(self.size*2)), pygame.SRCALPHA)
-        pygame.draw.circle(s, col, (int(self.size), int(self.size)), int(self.size))
-        surf.blit(s, (int(self.x - self.size), int(self.y - self.size)))
-
-particles = []
+# all particles live in one set of NumPy arrays (see particles.py): a frame
+# updates them in a batch and dead ones are compacted away, not list.remove()d
+particles = Particles(PARTICLE_CAPACITY)
 
 def update_particles(dt):
-    for p in particles[:]:
-        p.update(dt)
-        if p.life <= 0:
-            particles.remove(p)
+    particles.update(dt)
 
 def draw_particles():
-    for p in particles:
-        p.draw(screen)
+    for r in particles.draw(screen, sprites):
+        dirty.add(r)
 
-# ---------------------------
-# Pathfinding (A*)
-# ---------------------------
-def neighbors(cell):
-    x,y = cell
-    for dx,dy in ((1,0),(-1,0),(0,1),(0,-1)):
-        nx,ny = x+dx, y+dy
-        if 0 <= nx < COLS and 0 <= ny < ROWS:
-            yield (nx, ny)
-
-def a_star(start, goal, blocked):
-    if start == goal:
-        return []
-    open_set = {start}
-    came = {}
-    g = {start:0}
-    f = {start: abs(start[0]-goal[0]) + abs(start[1]-goal[1])}
-    while open_set:
-        cur = min(open_set, key=lambda c: f.get(c, 10**9))
-        if cur == goal:
-            path=[]
-            while cur in came:
-                path.append(cur)
-                cur = came[cur]
-            path.reverse()
-            return path
-        open_set.remove(cur)
-        for n in neighbors(cur):
-            if n in blocked:
-                continue
-            tg = g[cur] + 1
-            if tg < g.get(n, 10**9):
-                came[n] = cur
-                g[n] = tg
-                f[n] = tg + abs(n[0]-goal[0]) + abs(n[1]-goal[1])
-                open_set.add(n)
-    return None
-
-# ---------------------------
-# Maze generator (random walls) — ensures solvable
-# ---------------------------
-maze_walls = set()
-maze_start = (1,1)
-maze_goal = (COLS-2, ROWS-2)
-maze_path = []
-
-def generate_maze():
-    global maze_walls, maze_path
-    attempts = 0
-    while True:
-        attempts += 1
-        maze_walls = set()
-        # border walls
-        for x in range(COLS):
-            maze_walls.add((x,0)); maze_walls.add((x,ROWS-1))
-        for y in range(ROWS):
-            maze_walls.add((0,y)); maze_walls.add((COLS-1,y))
-        # random interior walls
-        density = (COLS * ROWS) // 3
-        for _ in range(density):
-            x = random.randint(1, COLS-2)
-            y = random.randint(1, ROWS-2)
-            if (x,y) not in (maze_start, maze_goal):
-                maze_walls.add((x,y))
-        path = a_star(maze_start, maze_goal, maze_walls)
-        if path:
-            maze_path = path
-            return
-        if attempts > 250:
-            # fallback simple border-only maze
-            maze_walls = set()
-            for x in range(COLS):
-                maze_walls.add((x,0)); maze_walls.add((x,ROWS-1))
-            for y in range(ROWS):
-                maze_walls.add((0,y)); maze_walls.add((COLS-1,y))
-            maze_path = a_star(maze_start, maze_goal, maze_walls) or []
-            return
+def cell_center(cell):
+    return (cell[0]*BLOCK + BLOCK//2, cell[1]*BLOCK + BLOCK//2)
 
 # ---------------------------
-# Game state
+# Engine events -> sound, particles, caption
 # ---------------------------
-snake = deque()
-snake.appendleft((COLS//4, ROWS//2))
-snake.append((COLS//4-1, ROWS//2))
-snake.append((COLS//4-2, ROWS//2))
-
-manual_dir = None
-auto_mode = True
-score = 0
-food = None
-
-def free_cells(blocked):
-    return [(x,y) for x in range(COLS) for y in range(ROWS) if (x,y) not in blocked]
-
-def place_food_avoiding(blocked):
-    choices = free_cells(blocked)
-    return random.choice(choices) if choices else None
-
-def reset_normal():
-    global snake, manual_dir, score, food
-    snake.clear()
-    snake.appendleft((COLS//4, ROWS//2))
-    snake.append((COLS//4-1, ROWS//2))
-    snake.append((COLS//4-2, ROWS//2))
-    manual_dir = None
-    score = 0
-    food = place_food_avoiding(set(snake))
-
-# Maze play setup
-def setup_maze_play():
-    global snake, manual_dir, score, food
-    snake.clear()
-    snake.appendleft(maze_start)
-    # small trailing
-    if maze_start[0]+1 < COLS and (maze_start[0]+1, maze_start[1]) not in maze_walls:
-        snake.append((maze_start[0]+1, maze_start[1]))
-    score = 0
-    manual_dir = None
-    blocked = set(snake) | maze_walls
-    food = place_food_avoiding(blocked)
-
-# initialize
-reset_normal()
-generate_maze()
+EVENT_SOUNDS = {
+    snake_engine.MOVE: SND_MOVE,
+    snake_engine.EAT: SND_EAT,
+    snake_engine.WRAP: SND_WRAP,
+    snake_engine.BLOCKED: SND_INVALID,
+    snake_engine.CLEARED: SND_MAZE_EXIT,
+}
+
+def handle_events():
+    """Turn what the engine reported since the last call into sound and effects."""
+    for kind, cell in engine.events:
+        play(EVENT_SOUNDS.get(kind))
+        if kind == snake_engine.MOVE:
+            # neon trail where the head was; color picked from palette per particle
+            particles.emit(cell_center(cell), 1, NEON_BODY_PALETTE, size=3.2, speed=0.9, life=0.28)
+        elif kind == snake_engine.EAT:
+            # eat burst particles
+            if engine.puzzle_mode:
+                particles.emit(cell_center(cell), 24, NEON_BODY_PALETTE, size=(2,5), speed=(1.2,3.8), life=(0.35,0.9))
+            else:
+                particles.emit(cell_center(cell), 22, NEON_BODY_PALETTE, size=(2,5), speed=(1.2,3.6), life=(0.35,0.85))
+        elif kind == snake_engine.NEW_MAZE:
+            m = engine.maze
+            # report what the generator took in the title bar
+            pygame.display.set_caption(f"Premium Neon Snake — Maze Play — {engine.maze_style} #{m.seed} in {m.attempts} tries, {m.seconds*1000:.1f} ms")
+    engine.events.clear()
 
 # ---------------------------
-# Animated food (glow/pulse/sparkle)
+# Board: neon look over render.BoardRenderer
 # ---------------------------
-import time
-def draw_animated_food():
-    if food is None:
-        return
-    fx = food[0] * BLOCK + BLOCK//2
-    fy = food[1] * BLOCK + BLOCK//2
-    t = pygame.time.get_ticks() * 0.003
-    pulse = (math.sin(t*2.0) * 0.15 + 1.0)  # 0.85..1.15
-    radius = int((BLOCK//2 - 4) * pulse)
-    # color cycle
-    r = int(220 + 35 * math.sin(t*2.3))
-    g = int(70 + 60 * math.sin(t*1.6))
-    b = int(70 + 60 * math.sin(t*2.9))
-    col = (max(0,min(255,r)), max(0,min(255,g)), max(0,min(255,b)))
-
-    # glow surface
-    glow_size = radius*3
-    glow = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-    pygame.draw.circle(glow, (col[0], col[1], col[2], 90), (glow_size//2, glow_size//2), radius+8)
-    screen.blit(glow, (fx - glow_size//2, fy - glow_size//2), special_flags=pygame.BLEND_ADD)
-
-    # main circle
-    pygame.draw.circle(screen, col, (fx, fy), radius)
-
-    # sparkle
-    sparkle_angle = t * 4.0
-    sx = fx + int(math.cos(sparkle_angle) * (radius*0.6))
-    sy = fy + int(math.sin(sparkle_angle) * (radius*0.6))
-    pygame.draw.circle(screen, (255,255,255), (sx, sy), max(1, radius//6))
-
-# ---------------------------
-# Add trail particle (neon) at head position
-# ---------------------------
-def spawn_trail():
-    hx, hy = snake[0]
-    px = hx * BLOCK + BLOCK//2
-    py = hy * BLOCK + BLOCK//2
-    # pick color from palette
-    col = random.choice(NEON_BODY_PALETTE)
-    particles.append(Particle((px, py), col, size=3.2, speed=0.9, life=0.28))
-
-# ---------------------------
-# Movement steps
-# ---------------------------
-def snake_step_normal():
-    """Normal world: wrapping allowed (immortal)."""
-    global snake, score, food, manual_dir
-    hx, hy = snake[0]
-    wrapped = False
-
-    if auto_mode:
-        blocked = set(list(snake)[:-1])  # allow stepping into tail
-        path = a_star((hx,hy), food, blocked) if food is not None else None
-        if path:
-            nxt = path[0]
-        else:
-            nxt = ((hx + 1) % COLS, hy)
-            wrapped = ((hx + 1) % COLS != hx + 1)
-    else:
-        if manual_dir is None:
-            dx, dy = (1, 0)
-        else:
-            dx, dy = manual_dir
-        nx = (hx + dx) % COLS
-        ny = (hy + dy) % ROWS
-        nxt = (nx, ny)
-        wrapped = (nx != hx + dx or ny != hy + dy)
-
-    # sound + trail
-    play(SND_MOVE)
-    spawn_trail()
-
-    # move
-    snake.appendleft(nxt)
-    if nxt == food:
-        play(SND_EAT)
-        # eat burst particles
-        fx = nxt[0]*BLOCK + BLOCK//2
-        fy = nxt[1]*BLOCK + BLOCK//2
-        for _ in range(22):
-            c = random.choice(NEON_BODY_PALETTE)
-            particles.append(Particle((fx, fy), c, size=random.uniform(2,5), speed=random.uniform(1.2,3.6), life=random.uniform(0.35,0.85)))
-        score += 1
-        blocked = set(snake)
-        food = place_food_avoiding(blocked)
-    else:
-        snake.pop()
-
-    if wrapped:
-        play(SND_WRAP)
-
-def snake_step_maze():
-    """Maze play: no wrapping, walls block movement. Snake starts at maze_start."""
-    global snake, score, food, manual_dir
-    hx, hy = snake[0]
-
-    if auto_mode:
-        blocked = set(list(snake)[:-1]) | maze_walls
-        path = a_star((hx,hy), food, blocked) if food is not None else None
-        if not path:
-            # regenerate if path disappeared
-            generate_maze()
-            setup_maze_play()
-            return
-        nxt = path[0]
-    else:
-        if manual_dir is None:
-            return  # don't move until player presses a key
-        dx, dy = manual_dir
-        cand = (hx + dx, hy + dy)
-        # invalid if wall or outside
-        if cand in maze_walls or not (0 <= cand[0] < COLS and 0 <= cand[1] < ROWS):
-            play(SND_INVALID)
-            return
-        nxt = cand
-
-    # sound + trail
-    play(SND_MOVE)
-    spawn_trail()
-
-    # move
-    snake.appendleft(nxt)
-    if nxt == food:
-        play(SND_EAT)
-        fx = nxt[0]*BLOCK + BLOCK//2
-        fy = nxt[1]*BLOCK + BLOCK//2
-        for _ in range(24):
-            c = random.choice(NEON_BODY_PALETTE)
-            particles.append(Particle((fx, fy), c, size=random.uniform(2,5), speed=random.uniform(1.2,3.8), life=random.uniform(0.35,0.9)))
-        score += 1
-        blocked = set(snake) | maze_walls
-        food = place_food_avoiding(blocked)
-        if food is None:
-            # completed: regenerate maze
-            generate_maze()
-            setup_maze_play()
-            play(SND_MAZE_EXIT)
-    else:
-        snake.pop()
-
-# attach helper used above but declared later
-def setup_maze_play():
-    global snake, manual_dir, score, food
-    snake.clear()
-    snake.appendleft(maze_start)
-    if maze_start[0]+1 < COLS and (maze_start[0]+1, maze_start[1]) not in maze_walls:
-        snake.append((maze_start[0]+1, maze_start[1]))
-    score = 0
-    manual_dir = None
-    blocked = set(snake) | maze_walls
-    food = place_food_avoiding(blocked)
+class NeonBoard(BoardRenderer):
+    """Checkered grid, maze path shown, glowing head and animated food.
+
+    Only food, head and particles are redrawn every frame; the body stays
+    on screen (BoardRenderer repaints just the cells the snake changed).
+    """
+
+    BG = BG
+    GRID = GRID
+    GRID_ALPHA = 110
+    CHECKER_ALPHA = 6  # subtle checker
+    BODY_COLORS = NEON_BODY_PALETTE
+    WALL_COLOR = WALL_COLOR
+    PATH_COLOR = PATH_COLOR  # the maze's solution, as an optional visual
+    START_COLOR = (80, 160, 255)
+    GOAL_COLOR = (255, 200, 40)
+    FOOD_REACH = 1  # the glow square, 24 px at its largest, spills a pixel; the head's doesn't
+
+    def draw_food(self, cell):
+        """Glow, pulse and sparkle."""
+        fx, fy = cell_center(cell)
+        t = pygame.time.get_ticks() * 0.003
+        pulse = (math.sin(t*2.0) * 0.15 + 1.0)  # 0.85..1.15
+        radius = int((BLOCK//2 - 4) * pulse)
+        # color cycle
+        r = int(220 + 35 * math.sin(t*2.3))
+        g = int(70 + 60 * math.sin(t*1.6))
+        b = int(70 + 60 * math.sin(t*2.9))
+        col = (max(0,min(255,r)), max(0,min(255,g)), max(0,min(255,b)))
+
+        # glow sprite; colour in steps of 16 keeps the cycle to a few hundred sprites
+        glow_size = radius*3
+        glow = sprites.circle(glow_size, glow_size//2, radius+8, (col[0] & ~15, col[1] & ~15, col[2] & ~15, 90))
+        dirty.add(screen.blit(glow, (fx - glow_size//2, fy - glow_size//2), special_flags=pygame.BLEND_ADD))
+
+        # main circle
+        dirty.add(pygame.draw.circle(screen, col, (fx, fy), radius))
+
+        # sparkle
+        sparkle_angle = t * 4.0
+        sx = fx + int(math.cos(sparkle_angle) * (radius*0.6))
+        sy = fy + int(math.sin(sparkle_angle) * (radius*0.6))
+        dirty.add(pygame.draw.circle(screen, (255,255,255), (sx, sy), max(1, radius//6)))
+
+    def draw_head(self, cell):
+        # head bright neon with glow
+        px, py = cell_center(cell)
+        glow = sprites.circle(BLOCK*2, BLOCK, BLOCK//2, (NEON_HEAD[0], NEON_HEAD[1], NEON_HEAD[2], 110))
+        dirty.add(screen.blit(glow, (px - BLOCK, py - BLOCK), special_flags=pygame.BLEND_ADD))
+        pygame.draw.circle(screen, NEON_HEAD, (px, py), BLOCK//2 - 3)
+        pygame.draw.circle(screen, (255,255,255), (px, py), 2)  # glossy dot
+
+    def draw_segment(self, cell, color):
+        # body: dots in palette colour, a bit smaller than the head
+        pygame.draw.circle(screen, color, cell_center(cell), BLOCK//2 - 5)
+
+board_view = NeonBoard(engine, dirty, BLOCK)
 
 # ---------------------------
 # Drawing functions
 # ---------------------------
-def draw_snake():
-    # head glow
-    for i, seg in enumerate(snake):
-        px = seg[0]*BLOCK + BLOCK//2
-        py = seg[1]*BLOCK + BLOCK//2
-        if i == 0:
-            # head bright neon with glow
-            glow = pygame.Surface((BLOCK*2, BLOCK*2), pygame.SRCALPHA)
-            pygame.draw.circle(glow, (NEON_HEAD[0], NEON_HEAD[1], NEON_HEAD[2], 110), (BLOCK, BLOCK), BLOCK//2)
-            screen.blit(glow, (px - BLOCK, py - BLOCK), special_flags=pygame.BLEND_ADD)
-            pygame.draw.circle(screen, NEON_HEAD, (px, py), BLOCK//2 - 3)
-            pygame.draw.circle(screen, (255,255,255), (px, py), 2)  # glossy dot
-        else:
-            # body: dot gradient picks color by index and size fades a bit
-            col = NEON_BODY_PALETTE[i % len(NEON_BODY_PALETTE)]
-            size = BLOCK//2 - 5
-            pygame.draw.circle(screen, col, (px, py), size)
-
 def draw_normal():
-    screen.fill(BG)
-    screen.blit(grid_surf, (0,0))
-    if food:
-        draw_animated_food()
-    draw_snake()
+    board_view.draw()
     draw_particles()
-    txt = FONT.render(f"NORMAL | Score:{score} | Speed:{speed_mult:.2f}x | TAB=Auto/Manual | M=Maze", True, TEXT)
-    screen.blit(txt, (8,8))
+    dirty.add(hud.draw(screen, (8,8), "NORMAL | Score:", str(engine.score), " | Speed:", f"{speed_mult:.2f}x",
+                       " | ", engine.planner_name, " | TAB=Auto/Manual | M=Maze"))
 
 def draw_maze():
-    screen.fill(BG)
-    screen.blit(grid_surf, (0,0))
-    # walls
-    for w in maze_walls:
-        pygame.draw.rect(screen, WALL_COLOR, (w[0]*BLOCK, w[1]*BLOCK, BLOCK, BLOCK))
-    # path (optional visual)
-    for p in maze_path:
-        pygame.draw.rect(screen, PATH_COLOR, (p[0]*BLOCK+6, p[1]*BLOCK+6, BLOCK-12, BLOCK-12), border_radius=3)
-    # start / goal markers
-    pygame.draw.rect(screen, (80,160,255), (maze_start[0]*BLOCK+4, maze_start[1]*BLOCK+4, BLOCK-8, BLOCK-8))
-    pygame.draw.rect(screen, (255,200,40), (maze_goal[0]*BLOCK+4, maze_goal[1]*BLOCK+4, BLOCK-8, BLOCK-8))
-    # food & snake & particles
-    if food:
-        draw_animated_food()
-    draw_snake()
+    board_view.draw()
     draw_particles()
-    txt = FONT.render(f"MAZE PLAY | Score:{score} | Speed:{speed_mult:.2f}x | TAB=Auto/Manual | R=Regen | M=Exit", True, TEXT)
-    screen.blit(txt, (8,8))
-
-# ---------------------------
-# Main loop
-# ---------------------------
-puzzle_mode = False
-running = True
-
-# ensure initial food
-if food is None:
-    food = place_food_avoiding(set(snake))
-
-while running:
-    # tick according to speed multiplier
-    tick_val = max(1, int(FPS_BASE * speed_mult))
-    dt = clock.tick(tick_val) / 1000.0
+    dirty.add(hud.draw(screen, (8,8), "MAZE PLAY | Score:", str(engine.score), " | Speed:", f"{speed_mult:.2f}x",
+                       " | ", engine.planner_name, " | TAB=Auto/Manual | R=Regen | M=Exit"))
 
-    # update particles (dt seconds)
-    update_particles(dt)
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        if event.type == pygame.KEYDOWN:
-            # quit
-            if event.key == pygame.K_ESCAPE:
-                running = False
-
-            # speed controls (handle keypad as well)
-            if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
-                speed_mult = min(6.0, speed_mult + 0.25)
-                play(SND_SPEED_UP)
-            if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
-                speed_mult = max(0.25, speed_mult - 0.25)
-                play(SND_SPEED_DOWN)
-
-            # toggle maze play
-            if event.key == pygame.K_m:
-                puzzle_mode = not puzzle_mode
-                if puzzle_mode:
-                    play(SND_MAZE_ENTER)
-                    generate_maze()
-                    setup_maze_play()
-                else:
-                    play(SND_MAZE_EXIT)
-                    reset_normal()
-
-            # regen / reset
-            if event.key == pygame.K_r:
-                if puzzle_mode:
-                    generate_maze()
-                    setup_maze_play()
-                else:
-                    reset_normal()
-
-            # toggle auto/manual (note uppercase K_TAB)
-            if event.key == pygame.K_TAB:
-                auto_mode = not auto_mode
-
-            # movement keys (work in both modes; in maze they respect walls)
-            if event.key == pygame.K_UP:
-                manual_dir = (0, -1)
-            if event.key == pygame.K_DOWN:
-                manual_dir = (0, 1)
-            if event.key == pygame.K_LEFT:
-                manual_dir = (-1, 0)
-            if event.key == pygame.K_RIGHT:
-                manual_dir = (1, 0)
-
-    # update game state
-    if puzzle_mode:
-        # ensure food exists in maze
-        if food is None:
-            blocked = set(snake) | maze_walls
-            food = place_food_avoiding(blocked)
-            if food is None:
-                generate_maze()
-                setup_maze_play()
-        snake_step_maze()
+def draw():
+    if engine.puzzle_mode:
         draw_maze()
     else:
-        if food is None:
-            food = place_food_avoiding(set(snake))
-        snake_step_normal()
         draw_normal()
 
-    pygame.display.flip()
+def draw_profile():
+    """Profiler overlay, bottom-left; the numbers refresh every PROFILE_REFRESH_MS."""
+    global profile_at
+    now = pygame.time.get_ticks()
+    if now - profile_at >= PROFILE_REFRESH_MS:
+        profile_panel.set(profiler.report())
+        profile_at = now
+    dirty.add(profile_panel.draw(screen, (8, HEIGHT - 8)))
+
+# ---------------------------
+# Main loop
+# ---------------------------
+# movement keys (work in both modes; in maze they respect walls)
+DIRECTION_KEYS = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+}
+
+def main():
+    global speed_mult, show_profile
+
+    # initial maze, so the title bar reports the generator from the start
+    engine.generate_maze()
+    handle_events()
+
+    clock_steps = FixedStep()
+    running = True
+
+    profiler.start()
+    while running:
+        dt = clock.tick(RENDER_FPS) / 1000.0
+        clock_steps.add(dt)
+        profiler.lap("wait")
+
+        # update particles (dt seconds)
+        update_particles(dt)
+        profiler.lap("particles")
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
 
-pygame.quit()
-sys.exit()
+            if event.type == pygame.KEYDOWN:
+                # quit
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+
+                # speed controls (handle keypad as well)
+                if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS) and speed_mult < 6.0:
+                    speed_mult = min(6.0, speed_mult + 0.25)
+                    play(SND_SPEED_UP)
+                if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed_mult = max(0.25, speed_mult - 0.25)
+                    play(SND_SPEED_DOWN)
+                # fast-forward: PgUp / PgDn double or halve the step rate
+                if event.key == pygame.K_PAGEUP:
+                    speed_mult = min(MAX_SPEED, speed_mult * 2)
+                    play(SND_SPEED_UP)
+                if event.key == pygame.K_PAGEDOWN:
+                    speed_mult = max(0.25, speed_mult / 2)
+                    play(SND_SPEED_DOWN)
+
+                # toggle maze play
+                if event.key == pygame.K_m:
+                    engine.set_puzzle_mode(not engine.puzzle_mode)
+                    play(SND_MAZE_ENTER if engine.puzzle_mode else SND_MAZE_EXIT)
+
+                # regen / reset
+                if event.key == pygame.K_r:
+                    engine.reset()
+
+                # cycle maze style (regenerates when in maze play)
+                if event.key == pygame.K_g:
+                    engine.cycle_maze_style()
+
+                # toggle auto/manual (note uppercase K_TAB)
+                if event.key == pygame.K_TAB:
+                    engine.auto_mode = not engine.auto_mode
+
+                # cycle auto-pilot planner
+                if event.key == pygame.K_p:
+                    engine.cycle_planner()
+
+                # dirty-rect rendering vs full redraw, to compare frame cost
+                if event.key == pygame.K_d:
+                    dirty.toggle()
+
+                # profiler: F3 overlay, F4 dump recent frame timings to CSV
+                if event.key == pygame.K_F3:
+                    show_profile = not show_profile
+                if event.key == pygame.K_F4:
+                    print(f"profile: wrote {profiler.dump()}")
+                # F5: save a replay of the session so far (`python replay.py <file>`)
+                if event.key == pygame.K_F5:
+                    print(f"replay: wrote {session.recorder.save()}")
+
+                if event.key in DIRECTION_KEYS:
+                    engine.steer(DIRECTION_KEYS[event.key])
+        profiler.lap("input")
+
+        # update game state
+        for _ in range(clock_steps.steps(FPS_BASE * speed_mult)):
+            engine.step()
+        profiler.lap("sim")
+        handle_events()
+        profiler.lap("events")
+
+        draw()
+        if show_profile:
+            draw_profile()
+        profiler.lap("draw")
+        dirty.present()
+        profiler.lap("present")
+        profiler.frame()
+
+    session.close()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Structure-of-arrays particle engine used by "most advance.py"."""
+import numpy as np
+
+
+class Particles:
+    """Fixed-capacity particle pool kept in parallel NumPy arrays.
+
+    Slots [0, n) are the live particles. update() moves, ages and applies
+    gravity to all of them in a few array operations, then swap-compacts
+    the dead ones: the survivors beyond the new count drop into the holes
+    it leaves, so only as many particles move as died. emit() never
+    grows the arrays; past `capacity` the extra particles are dropped.
+    """
+
+    def __init__(self, capacity=512, rng=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(rng)
+        self.n = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.size = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return self.n
+
+    def _sample(self, value, count):
+        if isinstance(value, tuple):
+            return self.rng.uniform(value[0], value[1], count)
+        return np.full(count, float(value))
+
+    def emit(self, pos, count, palette, size=4, speed=2.5, life=0.6):
+        """Spawn count particles at pos flying off in random directions.
+
+        Colours are drawn from palette; size, speed and life are numbers or
+        (lo, hi) ranges sampled uniformly per particle.
+        """
+        count = min(count, self.capacity - self.n)
+        if count <= 0:
+            return
+        s = slice(self.n, self.n + count)
+        rng = self.rng
+        angle = rng.random(count) * (2 * np.pi)
+        speed = self._sample(speed, count)
+        self.pos[s] = pos
+        # each axis gets its own jitter, like the per-object version had
+        self.vel[s, 0] = np.cos(angle) * speed * rng.uniform(0.6, 1.2, count)
+        self.vel[s, 1] = np.sin(angle) * speed * rng.uniform(0.6, 1.2, count)
+        self.life[s] = self.max_life[s] = self._sample(life, count)
+        self.size[s] = self._sample(size, count)
+        self.color[s] = np.asarray(palette, dtype=np.uint8)[rng.integers(0, len(palette), count)]
+        self.n += count
+
+    def update(self, dt):
+        n = self.n
+        if not n:
+            return
+        step = dt * 60
+        self.pos[:n] += self.vel[:n] * step
+        self.life[:n] -= dt
+        self.vel[:n, 1] += 0.02 * step  # small gravity-ish fade
+        alive = self.life[:n] > 0
+        k = int(np.count_nonzero(alive))
+        if k == n:
+            return
+        holes = np.flatnonzero(~alive[:k])
+        movers = np.flatnonzero(alive[k:]) + k
+        for a in (self.pos, self.vel, self.life, self.max_life, self.size, self.color):
+            a[holes] = a[movers]
+        self.n = k
+
+    def clear(self):
+        self.n = 0
+
+    def draw(self, surf, sprites, alpha_step=16):
+        """Blit each live particle as a fading circle; returns the rects touched.
+
+        Sprites come from a render.SpriteCache, with alpha rounded down to
+        multiples of alpha_step so the fade reuses a few dozen surfaces.
+        """
+        n = self.n
+        if not n:
+            return []
+        size = self.size[:n]
+        alpha = np.maximum(0, (255 * self.life[:n] / self.max_life[:n]).astype(int))
+        alpha -= alpha % alpha_step
+        xy = (self.pos[:n] - size[:, None]).astype(int)
+        d = (size * 2).astype(int)
+        rad = size.astype(int)
+        rects = []
+        blit, circle = surf.blit, sprites.circle
+        for (x, y), d, r, (cr, cg, cb), a in zip(xy.tolist(), d.tolist(), rad.tolist(),
+                                                 self.color[:n].tolist(), alpha.tolist()):
+            rects.append(blit(circle(d, r, r, (cr, cg, cb, a)), (x, y)))
+        return rects
@@ -0,0 +1,477 @@
+"""Grid pathfinding shared by game.py and "most advance.py".
+
+Searches run on the integer cell indices of a grid.Grid; blocked is either
+a per-cell sequence (a bytearray mask from Grid.mask()) where nonzero means
+the cell cannot be entered, or a grid.Blocked view over an Occupancy.
+With wrap set, the board is a torus like normal mode: moves cross the edges
+and the heuristic is the toroidal Manhattan distance.
+
+search() and the planners (through their .stats attribute) take an
+optional telemetry.SearchStats: each search then reports the cells it
+expanded, the open set's peak size and the path length (None when it
+failed) to stats.record(). With None nothing is recorded.
+"""
+import heapq
+
+import numpy as np
+
+from grid import Blocked
+
+DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def search(grid, start, goal, blocked, wrap=False, stats=None):
+    """A* from cell index start to goal.
+
+    Returns the list of indices after start up to and including goal ([]
+    when start == goal), or None if goal is unreachable. The open set is a
+    binary heap with lazy deletion: a cell may be pushed several times and
+    stale entries are skipped when popped. Ties on f go to the lower h so
+    the search runs straight at the goal instead of flooding equal-f
+    plateaus. g and parent live in the grid's preallocated buffers.
+    With stats set it runs as _search_counted() instead, so the plain
+    search does no accounting at all.
+    """
+    if start == goal:
+        return []
+    if stats is not None:
+        return _search_counted(grid, start, goal, blocked, wrap, stats)
+    if isinstance(blocked, Blocked):
+        blocked, allow = blocked.cells, blocked.allow
+    else:
+        allow = -1
+    xs, ys, nbr = grid.xs, grid.ys, grid.neighbours(wrap)
+    g, parent, seen = grid.g, grid.parent, grid.seen
+    stamp = grid.next_stamp()
+    heappush, heappop = heapq.heappush, heapq.heappop
+    cols, rows = grid.cols, grid.rows
+
+    gx, gy = xs[goal], ys[goal]
+    h = grid.distance(start, goal, wrap)
+    seen[start] = stamp
+    g[start] = 0
+    heap = [(h, h, start)]
+    while heap:
+        f, h, cur = heappop(heap)
+        cur_g = f - h
+        if cur_g != g[cur]:
+            continue  # stale entry, a cheaper one was already expanded
+        if cur == goal:
+            path = []
+            while cur != start:
+                path.append(cur)
+                cur = parent[cur]
+            path.reverse()
+            return path
+        tg = cur_g + 1
+        k = cur << 2
+        for n in nbr[k:k + 4]:
+            if n < 0:
+                continue
+            b = blocked[n]
+            if b and (n != allow or b > 1):
+                continue
+            if seen[n] != stamp:
+                seen[n] = stamp
+            elif tg >= g[n]:
+                continue
+            g[n] = tg
+            parent[n] = cur
+            dx = abs(xs[n] - gx)
+            dy = abs(ys[n] - gy)
+            if wrap:
+                if 2 * dx > cols:
+                    dx = cols - dx
+                if 2 * dy > rows:
+                    dy = rows - dy
+            nh = dx + dy
+            heappush(heap, (tg + nh, nh, n))
+    return None
+
+
+def _search_counted(grid, start, goal, blocked, wrap, stats):
+    """search() that also counts expansions and the open set's peak for stats.
+
+    The same loop line for line, plus the counters; keep the two in step.
+    """
+    if isinstance(blocked, Blocked):
+        blocked, allow = blocked.cells, blocked.allow
+    else:
+        allow = -1
+    xs, ys, nbr = grid.xs, grid.ys, grid.neighbours(wrap)
+    g, parent, seen = grid.g, grid.parent, grid.seen
+    stamp = grid.next_stamp()
+    heappush, heappop = heapq.heappush, heapq.heappop
+    cols, rows = grid.cols, grid.rows
+
+    gx, gy = xs[goal], ys[goal]
+    h = grid.distance(start, goal, wrap)
+    seen[start] = stamp
+    g[start] = 0
+    heap = [(h, h, start)]
+    expanded, peak = 0, 1
+    while heap:
+        f, h, cur = heappop(heap)
+        cur_g = f - h
+        if cur_g != g[cur]:
+            continue  # stale entry, a cheaper one was already expanded
+        expanded += 1
+        if cur == goal:
+            path = []
+            while cur != start:
+                path.append(cur)
+                cur = parent[cur]
+            path.reverse()
+            stats.record("astar", expanded, peak, len(path))
+            return path
+        tg = cur_g + 1
+        k = cur << 2
+        for n in nbr[k:k + 4]:
+            if n < 0:
+                continue
+            b = blocked[n]
+            if b and (n != allow or b > 1):
+                continue
+            if seen[n] != stamp:
+                seen[n] = stamp
+            elif tg >= g[n]:
+                continue
+            g[n] = tg
+            parent[n] = cur
+            dx = abs(xs[n] - gx)
+            dy = abs(ys[n] - gy)
+            if wrap:
+                if 2 * dx > cols:
+                    dx = cols - dx
+                if 2 * dy > rows:
+                    dy = rows - dy
+            nh = dx + dy
+            heappush(heap, (tg + nh, nh, n))
+        if len(heap) > peak:
+            peak = len(heap)
+    stats.record("astar", expanded, peak, None)
+    return None
+
+
+def a_star(grid, start, goal, blocked, wrap=False, stats=None):
+    """search() for (x, y) cells: returns a list of (x, y) or None."""
+    path = search(grid, grid.index(start), grid.index(goal), blocked, wrap, stats)
+    if path is None:
+        return None
+    return [grid.cell(i) for i in path]
+
+
+class PathCache:
+    """Auto-pilot planner that keeps the last A* path and walks it.
+
+    Between ticks the board only changes at the cells reported through
+    cells_changed(): normally the new head, which is the cell the path just
+    handed out, and the vacated tail, which can't block anything. So while
+    the snake follows the path towards the same goal the rest of it stays
+    valid. A reported cell that lies on the remaining path drops it, and so
+    do a new goal or a head that isn't where the path left it (manual
+    steering, a reset); the next tick is then a miss and a fresh search.
+    hits/misses count reused ticks vs. searches.
+    """
+
+    def __init__(self, grid, wrap=False):
+        self.grid = grid
+        self.wrap = wrap
+        self.hits = 0
+        self.misses = 0
+        self.stats = None
+        self.clear()
+
+    def clear(self):
+        self.path = []  # remaining cells, reversed so the next step is path[-1]
+        self.on_path = set()
+        self.goal = -1
+        self.head = -1
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def cells_changed(self, *cells):
+        on_path = self.on_path
+        for c in cells:
+            if c in on_path:
+                self.clear()
+                return
+
+    def next_step(self, head, goal, blocked):
+        """Cell index to move to from head, or -1 if goal is unreachable."""
+        path = self.path
+        if path and goal == self.goal and head == self.head:
+            self.hits += 1
+        else:
+            self.misses += 1
+            path = search(self.grid, head, goal, blocked, self.wrap, self.stats)
+            if not path:
+                self.clear()
+                return -1
+            path.reverse()
+            self.path, self.goal, self.on_path = path, goal, set(path)
+        self.head = path.pop()
+        self.on_path.discard(self.head)
+        return self.head
+
+
+INF = 1 << 30
+
+
+class DStarLite:
+    """Incremental auto-pilot planner (D* Lite, Koenig & Likhachev 2002).
+
+    Searches backwards from the goal, so when the snake moves only the start
+    changes and the tree towards the food survives. The step functions
+    report the cells whose blocked state may have flipped (new head, popped
+    tail) through cells_changed(); next_step() re-evaluates just their
+    neighbours and repairs the tree, so a tick costs in proportion to what
+    changed rather than to the board. A new goal starts a fresh search.
+    searches counts fresh searches, repairs the incremental ones.
+    """
+
+    def __init__(self, grid, wrap=False):
+        self.grid = grid
+        self.wrap = wrap
+        self.nbr = grid.neighbours(wrap)
+        self.searches = 0
+        self.repairs = 0
+        self.stats = None
+        self.clear()
+
+    def clear(self):
+        self.goal = -1
+        self.start = -1
+        self.allow = -1
+        self.changed = set()
+
+    def reset_stats(self):
+        self.searches = 0
+        self.repairs = 0
+
+    def cells_changed(self, *cells):
+        if self.goal >= 0:
+            self.changed.update(c for c in cells if c >= 0)
+
+    def _h(self, a, b):
+        return self.grid.distance(a, b, self.wrap)
+
+    def _key(self, s):
+        m = min(self.g[s], self.rhs[s])
+        return (m + self._h(self.start, s) + self.km, m)
+
+    def _update(self, u):
+        g, rhs, cells, allow = self.g, self.rhs, self.cells, self.allow
+        if u != self.goal:
+            best = INF
+            k = u << 2
+            for v in self.nbr[k:k + 4]:
+                if v < 0:
+                    continue
+                b = cells[v]
+                if b and (v != allow or b > 1):
+                    continue
+                if g[v] + 1 < best:
+                    best = g[v] + 1
+            rhs[u] = best
+        if g[u] != rhs[u]:
+            k1, k2 = self._key(u)
+            heapq.heappush(self.open, (k1, k2, u))
+
+    def _compute(self):
+        g, rhs, nbr, start = self.g, self.rhs, self.nbr, self.start
+        heap, heappop, heappush = self.open, heapq.heappop, heapq.heappush
+        expanded, peak = 0, len(heap)
+        while heap:
+            top = heap[0]
+            start_key = self._key(start)
+            if (top[0], top[1]) >= start_key and rhs[start] == g[start]:
+                break
+            k1, k2, u = heappop(heap)
+            if g[u] == rhs[u]:
+                continue  # stale: already made consistent
+            new = self._key(u)
+            if (k1, k2) < new:
+                heappush(heap, (new[0], new[1], u))
+                continue
+            if (k1, k2) > new:
+                continue  # stale: a fresher entry for u is (or was) queued
+            expanded += 1
+            k = u << 2
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for s in nbr[k:k + 4]:
+                    if s >= 0:
+                        self._update(s)
+            else:
+                g[u] = INF
+                self._update(u)
+                for s in nbr[k:k + 4]:
+                    if s >= 0:
+                        self._update(s)
+            if len(heap) > peak:
+                peak = len(heap)
+        return expanded, peak
+
+    def next_step(self, head, goal, blocked):
+        """Cell index to move to from head, or -1 if goal is unreachable."""
+        if isinstance(blocked, Blocked):
+            cells, allow = blocked.cells, blocked.allow
+        else:
+            cells, allow = blocked, -1
+        self.cells = cells
+        if goal != self.goal:
+            size = self.grid.size
+            self.g = [INF] * size
+            self.rhs = [INF] * size
+            self.goal, self.start, self.allow, self.km = goal, head, allow, 0
+            self.changed = set()
+            self.rhs[goal] = 0
+            self.open = [(self._h(head, goal), 0, goal)]
+            self.searches += 1
+            kind = "dstar"
+        else:
+            changed = self.changed
+            if allow != self.allow:
+                changed.add(self.allow)
+                changed.add(allow)
+                self.allow = allow
+            if head != self.start:
+                self.km += self._h(self.start, head)
+                self.start = head
+            nbr = self.nbr
+            affected = set()
+            for v in changed:
+                if v >= 0:
+                    affected.update(nbr[v << 2:(v << 2) + 4])
+            affected.discard(-1)
+            for u in affected:
+                self._update(u)
+            changed.clear()
+            self.repairs += 1
+            kind = "dstar-repair"
+        expanded, peak = self._compute()
+
+        g = self.g
+        if self.stats is not None:
+            self.stats.record(kind, expanded, peak, g[head] if g[head] < INF else None)
+        if g[head] >= INF:
+            return -1
+        best, step = INF, -1
+        k = head << 2
+        for v in self.nbr[k:k + 4]:
+            if v < 0:
+                continue
+            b = cells[v]
+            if b and (v != allow or b > 1):
+                continue
+            if g[v] + 1 < best:
+                best, step = g[v] + 1, v
+        return step
+
+
+def distance_field(grid, goal, blocked, wrap=False):
+    """BFS distance (in steps) from goal to every reachable cell, -1 elsewhere.
+
+    Vectorized wavefront: each wave gathers the neighbours of the whole
+    frontier from the grid's neighbour table in one NumPy operation, so the
+    field costs O(cells) array work instead of a Python loop per cell.
+    Blocking follows search(): blocked cells are never entered.
+    """
+    if isinstance(blocked, Blocked):
+        cells, allow = blocked.cells, blocked.allow
+    else:
+        cells, allow = blocked, -1
+    counts = np.asarray(memoryview(cells))
+    open_ = counts == 0
+    if allow >= 0 and counts[allow] == 1:
+        open_[allow] = True
+    nbr = np.frombuffer(grid.neighbours(wrap), dtype=np.int32).reshape(grid.size, 4)
+    dist = np.full(grid.size, -1, dtype=np.int32)
+    dist[goal] = 0
+    open_[goal] = False
+    front = np.array([goal], dtype=np.int32)
+    d = 0
+    while front.size:
+        d += 1
+        cand = nbr[front].ravel()
+        cand = cand[cand >= 0]
+        cand = np.unique(cand[open_[cand]])
+        open_[cand] = False
+        dist[cand] = d
+        front = cand
+    return dist
+
+
+def field_counts(dist):
+    """(cells reached, widest wavefront) of a distance_field(), for telemetry."""
+    waves = np.bincount(dist[dist >= 0])
+    return int(waves.sum()), int(waves.max())
+
+
+class DistanceField:
+    """Auto-pilot planner that walks downhill on a distance field from the food.
+
+    The field from distance_field() is built once per food and reused while
+    the head keeps finding a neighbour exactly one step closer: the only
+    cells that become blocked meanwhile are the ones the head itself walked
+    through, all further from the food. Manual steering, a reset or a dead
+    end rebuild it. hits counts ticks served from an existing field,
+    misses counts field builds.
+    """
+
+    def __init__(self, grid, wrap=False):
+        self.grid = grid
+        self.wrap = wrap
+        self.nbr = grid.neighbours(wrap)
+        self.hits = 0
+        self.misses = 0
+        self.stats = None
+        self.clear()
+
+    def clear(self):
+        self.dist = None
+        self.goal = -1
+        self.head = -1
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def cells_changed(self, *cells):
+        pass  # the downhill check in next_step() catches a stale field
+
+    def _downhill(self, head, blocked):
+        dist = self.dist
+        best, step = INF, -1
+        k = head << 2
+        for v in self.nbr[k:k + 4]:
+            if v < 0 or blocked[v]:
+                continue
+            d = dist[v]
+            if 0 <= d < best:
+                best, step = d, v
+        return best, step
+
+    def next_step(self, head, goal, blocked):
+        """Cell index to move to from head, or -1 if goal is unreachable."""
+        if goal == self.goal and head == self.head:
+            best, step = self._downhill(head, blocked)
+            if step >= 0 and best == self.dist[head] - 1:
+                self.hits += 1
+                self.head = step
+                return step
+        self.misses += 1
+        self.dist = distance_field(self.grid, goal, blocked, self.wrap)
+        self.goal = goal
+        best, step = self._downhill(head, blocked)
+        self.head = step
+        if self.stats is not None:
+            reached, widest = field_counts(self.dist)
+            self.stats.record("field", reached, widest, int(best) + 1 if step >= 0 else None)
+        return step
+
+
+PLANNERS = {"A*": PathCache, "D* Lite": DStarLite, "Field": DistanceField}
@@ -0,0 +1,87 @@
+"""Per-frame phase timings for the main loops of game.py and "most advance.py"."""
+import time
+
+import numpy as np
+
+
+class Profiler:
+    """Splits every frame into named phases and keeps the recent frames.
+
+    The main loop calls start() before its first frame, lap(name) after
+    each phase and frame() at the end of every frame; a lap books the time
+    since the previous lap to that phase. Work timed inside a phase by
+    someone else (the engine's planner and maze generation, see
+    SnakeEngine.profiler) is reported with add() and taken out of the lap
+    it happened in, so the phases never overlap and a row sums to the
+    frame time. The last `window` frames are kept in one ring of
+    milliseconds, which percentiles() and dump() read.
+    """
+
+    def __init__(self, phases, window=1800):
+        self.phases = list(phases)
+        self.index = {name: i for i, name in enumerate(self.phases)}
+        self.window = window
+        self.ring = np.zeros((window, len(self.phases)))
+        self.row = np.zeros(len(self.phases))
+        self.frames = 0
+        self.nested = 0.0
+        self.t = time.perf_counter()
+
+    def start(self):
+        """Time from now on, dropping whatever was recorded so far."""
+        self.frames = 0
+        self.row.fill(0.0)
+        self.nested = 0.0
+        self.t = time.perf_counter()
+
+    def frame(self):
+        """Close the current frame's row and start the next one."""
+        self.ring[self.frames % self.window] = self.row
+        self.frames += 1
+        self.row.fill(0.0)
+
+    def lap(self, name):
+        t = time.perf_counter()
+        self.row[self.index[name]] += (t - self.t - self.nested) * 1000.0
+        self.t = t
+        self.nested = 0.0
+
+    def add(self, name, seconds):
+        self.row[self.index[name]] += seconds * 1000.0
+        self.nested += seconds
+
+    def recent(self):
+        """Rows of the kept frames, oldest first."""
+        if self.frames <= self.window:
+            return self.ring[:self.frames]
+        k = self.frames % self.window
+        return np.concatenate((self.ring[k:], self.ring[:k]))
+
+    def percentiles(self, q=(50, 95, 99)):
+        """{phase: [ms at each q]} over the kept frames, plus "frame" for the totals."""
+        rows = self.recent()
+        if not len(rows):
+            return {}
+        per_phase = np.percentile(rows, q, axis=0)
+        out = {name: per_phase[:, i].tolist() for i, name in enumerate(self.phases)}
+        out["frame"] = np.percentile(rows.sum(axis=1), q).tolist()
+        return out
+
+    def report(self):
+        """Table rows (phase, p50, p95, p99) as text, header first, for the overlay."""
+        rows = [("ms", "p50", "p95", "p99")]
+        for name, qs in self.percentiles().items():
+            rows.append((name,) + tuple(f"{v:.2f}" for v in qs))
+        return rows
+
+    def dump(self, path=None):
+        """Write the kept frames as CSV (one row per frame, ms); returns the path."""
+        if path is None:
+            path = time.strftime("profile-%Y%m%d-%H%M%S.csv")
+        rows = self.recent()
+        first = self.frames - len(rows)
+        with open(path, "w") as f:
+            f.write(",".join(["frame"] + self.phases) + "\n")
+            for k, row in enumerate(rows):
+                f.write(f"{first + k}," + ",".join(f"{v:.4f}" for v in row) + "\n")
+        return path
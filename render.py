@@ -0,0 +1,357 @@
+"""Drawing helpers for game.py, "most advance.py", replays and SnakeEnv."""
+from collections import OrderedDict
+from itertools import islice
+
+import pygame
+
+
+class DirtyRects:
+    """Redraw and present only the parts of the screen that changed.
+
+    Each frame starts with begin(background), which paints last frame's
+    rects back from the static background surface, and everything drawn on
+    top that changes from frame to frame (food, head, particles, HUD)
+    registers the rect it touched with add() (pygame's draw calls and
+    blit() return exactly that). What stays put, like the snake's body, is
+    not added and stays on screen; where it did change the caller paints
+    the background back with restore() and redraws whatever that, or
+    begin(), uncovered (see `restored`). present() then pushes the restored
+    and added rects with pygame.display.update(), so a frame costs in
+    proportion to what changed rather than to the board. A background
+    that is not the one used last frame (mode switch, new maze) repaints
+    in full, as does the frame after invalidate(). With enabled off it is
+    the plain full blit + flip.
+    """
+
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.background = None
+        self.prev = []
+        self.rects = []
+        self.restored = []  # painted back from the background this frame
+        self.full = True
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.invalidate()  # repaint everything once when switching
+
+    def invalidate(self):
+        """Repaint the whole screen at the next begin()."""
+        self.background = None
+
+    def begin(self, background):
+        if not self.enabled or background is not self.background:
+            self.screen.blit(background, (0, 0))
+            self.restored = []
+            self.full = True
+        else:
+            blit = self.screen.blit
+            for r in self.prev:
+                blit(background, r, r)
+            self.restored = list(self.prev)
+        self.background = background
+
+    def restore(self, rect):
+        """Paint the background back over rect, for this frame only."""
+        if not self.full:
+            self.restored.append(self.screen.blit(self.background, rect, rect))
+
+    def add(self, rect):
+        if rect:
+            self.rects.append(rect)
+        return rect
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.restored + self.rects)
+        self.finish()
+
+    def finish(self):
+        """End the frame without pushing it to the display (offscreen use)."""
+        self.prev, self.rects, self.restored, self.full = self.rects, [], [], False
+
+
+class SnakeChanges:
+    """The cells an engine's snake changed since the last call.
+
+    cells() compares the engine's move counter with the last call's: the
+    heads pushed since, the cell the old head left (it is body now) and
+    the tail cells given up are all that changed, since every other
+    segment stays on its cell and, coloured by when it was pushed
+    (`engine.moves - i`), keeps its colour. It returns None when that
+    can't be told: first call, a restart or replay seek, or so many moves
+    that the whole snake is new.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.snake = ()
+        self.moves = None
+        self.restarts = None
+
+    def cells(self):
+        e = self.engine
+        snake, new = e.snake, e.moves - (self.moves or 0)
+        kept = len(snake) - new  # segments that were there last time
+        if self.moves is None or e.restarts != self.restarts or not 0 < kept <= len(self.snake):
+            changed = None
+        elif new:
+            changed = list(islice(snake, new + 1))
+            changed.extend(self.snake[kept:])
+        else:
+            changed = []
+        self.snake, self.moves, self.restarts = tuple(snake), e.moves, e.restarts
+        return changed
+
+
+class BoardRenderer:
+    """game.py's look for an engine's board, drawn through a DirtyRects.
+
+    draw() lays down the background (grid; in maze play also the walls and
+    the start and goal markers), then the food and the snake; the caller
+    adds its HUD and presents. Food and head are redrawn every frame and
+    added to the DirtyRects. Body segments are only redrawn where
+    something uncovered them: the cells SnakeChanges reports, and the
+    rects restored under last frame's and this frame's food, head, HUD and
+    the like. The rest of the body is left on screen.
+
+    Backgrounds are built here, once per mode and once per maze (keyed on
+    the engine's Maze object), so renderers over different engines never
+    share one. Nothing here opens a window: the DirtyRects' surface can be
+    an offscreen one. Other looks subclass this: colours are class
+    attributes, and draw_food(), draw_head() and draw_segment() draw one
+    piece each, with FOOD_REACH / HEAD_REACH saying how far (in pixels)
+    the first two reach past their cell.
+    """
+
+    BG = (10, 15, 25)
+    GRID = (40, 60, 80)
+    GRID_ALPHA = 100
+    CHECKER_ALPHA = 0  # > 0 lightens every other cell
+    HEAD_COLOR = (50, 255, 80)   # neon green
+    BODY_COLORS = [
+        (255, 200, 0),   # yellow
+        (255, 150, 0),   # orange
+        (255, 90, 0)     # deep orange/red
+    ]
+    FOOD_COLOR = (255, 50, 50)
+    WALL_COLOR = (150, 150, 180)
+    PATH_COLOR = None  # set to also draw the maze's solution
+    START_COLOR = (90, 170, 255)
+    GOAL_COLOR = (255, 200, 40)
+    FOOD_REACH = 0
+    HEAD_REACH = 0
+
+    def __init__(self, engine, dirty, block=22):
+        self.engine = engine
+        self.dirty = dirty
+        self.block = block
+        self.size = (engine.cols * block, engine.rows * block)
+        self.changes = SnakeChanges(engine)
+        self.normal_layer = None
+        self.maze_layer = None
+        self.maze = None  # the Maze maze_layer was built for
+
+    def _layer(self):
+        width, height = self.size
+        block = self.block
+        # same pixel format as the target, so restoring from it is a plain copy
+        surf = pygame.Surface(self.size, 0, self.dirty.screen)
+        surf.fill(self.BG)
+        grid = pygame.Surface(self.size, pygame.SRCALPHA)
+        for x in range(0, width, block):
+            pygame.draw.line(grid, self.GRID + (self.GRID_ALPHA,), (x, 0), (x, height))
+        for y in range(0, height, block):
+            pygame.draw.line(grid, self.GRID + (self.GRID_ALPHA,), (0, y), (width, y))
+        if self.CHECKER_ALPHA:
+            square = pygame.Surface((block, block), pygame.SRCALPHA)
+            square.fill((255, 255, 255, self.CHECKER_ALPHA))
+            for y in range(self.engine.rows):
+                for x in range(y % 2, self.engine.cols, 2):
+                    grid.blit(square, (x * block, y * block))
+        surf.blit(grid, (0, 0))
+        return surf
+
+    def background(self):
+        e, block = self.engine, self.block
+        if not e.puzzle_mode:
+            if self.normal_layer is None:
+                self.normal_layer = self._layer()
+            return self.normal_layer
+        if self.maze_layer is None or self.maze is not e.maze:
+            surf = self._layer()
+            for w in e.board.cells_of(e.maze_walls):
+                pygame.draw.rect(surf, self.WALL_COLOR, (w[0]*block, w[1]*block, block, block))
+            if self.PATH_COLOR:
+                for p in e.maze_path:
+                    pygame.draw.rect(surf, self.PATH_COLOR, (p[0]*block+6, p[1]*block+6, block-12, block-12),
+                                     border_radius=3)
+            start, goal = e.maze_start, e.maze_goal
+            pygame.draw.rect(surf, self.START_COLOR, (start[0]*block+4, start[1]*block+4, block-8, block-8))
+            pygame.draw.rect(surf, self.GOAL_COLOR, (goal[0]*block+4, goal[1]*block+4, block-8, block-8))
+            self.maze_layer, self.maze = surf, e.maze
+        return self.maze_layer
+
+    def cell_rect(self, cell, reach=0):
+        block = self.block
+        return pygame.Rect(cell[0]*block - reach, cell[1]*block - reach, block + 2*reach, block + 2*reach)
+
+    def draw(self):
+        e, dirty, block = self.engine, self.dirty, self.block
+        changed = self.changes.cells()
+        if changed is None:
+            dirty.invalidate()
+        dirty.begin(self.background())
+        for cell in changed or ():
+            dirty.restore(self.cell_rect(cell))
+        # food and head are drawn under the body, so they go on cleared ground
+        head = e.snake[0]
+        if e.food:
+            dirty.restore(self.cell_rect(e.food, self.FOOD_REACH))
+        dirty.restore(self.cell_rect(head, self.HEAD_REACH))
+        if e.food:
+            self.draw_food(e.food)
+        self.draw_head(head)
+
+        if dirty.full:
+            redraw = None
+        else:
+            # the cells any restored rect overlaps: body segments there are redrawn
+            redraw = set()
+            cols, rows = e.cols, e.rows
+            for r in dirty.restored:
+                xs = range(max(r.left // block, 0), min((r.right - 1) // block + 1, cols))
+                for y in range(max(r.top // block, 0), min((r.bottom - 1) // block + 1, rows)):
+                    redraw.update((x, y) for x in xs)
+        colors, moves = self.BODY_COLORS, e.moves
+        for i, cell in enumerate(islice(e.snake, 1, None), 1):
+            if redraw is None or cell in redraw:
+                self.draw_segment(cell, colors[(moves - i) % len(colors)])
+
+    def draw_food(self, cell):
+        half = self.block // 2
+        center = (cell[0]*self.block + half, cell[1]*self.block + half)
+        self.dirty.add(pygame.draw.circle(self.dirty.screen, self.FOOD_COLOR, center, half-3))
+
+    def draw_head(self, cell):
+        half = self.block // 2
+        center = (cell[0]*self.block + half, cell[1]*self.block + half)
+        self.dirty.add(pygame.draw.circle(self.dirty.screen, self.HEAD_COLOR, center, half-2))
+
+    def draw_segment(self, cell, color):
+        half = self.block // 2
+        pygame.draw.circle(self.dirty.screen, color, (cell[0]*self.block + half, cell[1]*self.block + half), half-3)
+
+
+class SpriteCache:
+    """Pre-rendered circle sprites, shared between frames, with LRU eviction.
+
+    circle() hands back the same SRCALPHA surface for the same (size,
+    center, radius, color) key, so once the keys in use are cached a frame
+    allocates no surfaces. Callers quantize radius, colour and alpha to
+    keep the key space small. Sprites are shared: blit them, never draw on
+    them. hits/misses count lookups served from the cache vs. rendered.
+    """
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def circle(self, size, center, radius, color):
+        key = (size, center, radius, color)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (center, center), radius)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+        return sprite
+
+
+class Hud:
+    """Status line assembled from cached text pieces.
+
+    draw() takes the line as separate pieces, static labels and dynamic
+    values alike, renders each distinct piece once and afterwards only
+    blits the stored surfaces side by side. font.render() runs again only
+    when a value (score, speed, mode, planner) turns into one not seen
+    yet. Past `limit` distinct pieces the cache starts over.
+    """
+
+    def __init__(self, font, color, limit=256):
+        self.font = font
+        self.color = color
+        self.limit = limit
+        self.pieces = {}
+
+    def draw(self, surf, pos, *parts):
+        """Blit the pieces left to right from pos; returns the rect covered."""
+        x, y = pos
+        pieces = self.pieces
+        rects = []
+        for text in parts:
+            piece = pieces.get(text)
+            if piece is None:
+                if len(pieces) >= self.limit:
+                    pieces.clear()
+                piece = pieces[text] = self.font.render(text, True, self.color)
+            rects.append(surf.blit(piece, (x, y)))
+            x += piece.get_width()
+        return rects[0].unionall(rects[1:])
+
+
+class TextPanel:
+    """Table of text on a translucent backing, for debug readouts.
+
+    set() takes rows of cells and renders them into one surface, only when
+    they differ from the ones shown; draw() is a single blit. The first
+    column is left-aligned and the others right-aligned, so the columns
+    line up in any font. Callers refresh readouts that change every frame
+    (the profiler's) a few times a second.
+    """
+
+    def __init__(self, font, color, background=(0, 0, 0, 170), pad=6, gap=10):
+        self.font = font
+        self.color = color
+        self.background = background
+        self.pad = pad
+        self.gap = gap
+        self.rows = None
+        self.surf = None
+
+    def set(self, rows):
+        if rows == self.rows:
+            return
+        self.rows = rows
+        render, color = self.font.render, self.color
+        cells = [[render(text, True, color) for text in row] for row in rows]
+        ncols = max((len(row) for row in cells), default=0)
+        widths = [max((row[c].get_width() for row in cells if c < len(row)), default=0) for c in range(ncols)]
+        pad, gap, step = self.pad, self.gap, self.font.get_linesize()
+        width = sum(widths) + gap * max(ncols - 1, 0) + 2 * pad
+        self.surf = pygame.Surface((width, step * len(cells) + 2 * pad), pygame.SRCALPHA)
+        self.surf.fill(self.background)
+        for k, row in enumerate(cells):
+            x, y = pad, pad + k * step
+            for c, cell in enumerate(row):
+                self.surf.blit(cell, (x if c == 0 else x + widths[c] - cell.get_width(), y))
+                x += widths[c] + gap
+
+    def draw(self, surf, pos):
+        """Blit the panel with its bottom-left corner at pos; returns the rect."""
+        if self.surf is None:
+            return None
+        return surf.blit(self.surf, (pos[0], pos[1] - self.surf.get_height()))
@@ -0,0 +1,403 @@
+"""Compact binary game recordings and their playback.
+
+A Recorder attached to an engine.SnakeEngine logs the game as it is
+played: every head move as a 2-bit direction, four to a byte, and
+everything the moves don't determine (food placements, maze layouts,
+restarts) as varint-encoded events tagged with the move they follow. The
+rules are deterministic given those, so a Player rebuilds every state by
+re-applying them to an engine, with no planner and no random numbers:
+
+    rec = Recorder(engine)   # records from here on
+    ...
+    rec.save("run.replay")
+
+    python replay.py run.replay               # watch it, drawn the way game.py draws
+    python replay.py run.replay --headless    # re-simulate at full speed
+    python replay.py run.replay --seek 5000   # start after move 5000
+
+File layout, every integer an unsigned LEB128 varint:
+
+    b"SNKR" version cols rows moves len(events) events packed-moves
+
+Each event is (moves since the previous event, kind, payload):
+
+    FOOD      cell+1 (0 when the board is full)
+    RESTART   maze play (0/1); the snake starts where the engine puts it
+    MAZE      seed+1 (0 unknown), style index, then the wall mask as
+              packed bits
+    SNAPSHOT  maze play, score, food cell+1, length, body cells head
+              first; opens every recording with the state at attach time
+"""
+import argparse
+import bisect
+import os
+import sys
+import time
+
+import numpy as np
+
+import maze
+from engine import MAZE_STYLES, WRAP, SnakeEngine
+from vecenv import ACTIONS
+
+MAGIC = b"SNKR"
+VERSION = 1
+
+# event kinds
+FOOD, RESTART, MAZE, SNAPSHOT = range(4)
+
+
+def _put(out, value):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get(data, pos):
+    value = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+# ---------------------------
+# Recording
+# ---------------------------
+class Recorder:
+    """Logs an engine's game from now on; the engine calls it (see SnakeEngine.recorder)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.cols, self.rows = engine.cols, engine.rows
+        self.moves = bytearray()
+        self.count = 0
+        self.events = bytearray()
+        self.last = 0  # move count at the previous event
+        board = engine.board
+        if engine.maze is not None:
+            self.maze(engine.maze, engine.maze_style)
+        food = board.index(engine.food) if engine.food is not None else -1
+        self._event(SNAPSHOT, int(engine.puzzle_mode), engine.score, food + 1, len(engine.snake),
+                    *(board.index(c) for c in engine.snake))
+        engine.recorder = self
+
+    def detach(self):
+        if self.engine.recorder is self:
+            self.engine.recorder = None
+
+    def _event(self, kind, *values):
+        out = self.events
+        _put(out, self.count - self.last)
+        self.last = self.count
+        _put(out, kind)
+        for v in values:
+            _put(out, v)
+
+    def move(self, head, nxt):
+        # the step modulo the board size, so wrapped moves read as one step
+        dx = (nxt[0] - head[0]) % self.cols
+        dy = (nxt[1] - head[1]) % self.rows
+        d = 3 if dx == 1 else 2 if dx else 1 if dy == 1 else 0
+        k = self.count
+        if k & 3:
+            self.moves[-1] |= d << ((k & 3) << 1)
+        else:
+            self.moves.append(d)
+        self.count = k + 1
+
+    def food(self, i):
+        self._event(FOOD, i + 1)
+
+    def restart(self, maze_mode):
+        self._event(RESTART, int(maze_mode))
+
+    def maze(self, m, style):
+        self._event(MAZE, 0 if m.seed is None else m.seed + 1, MAZE_STYLES.index(style))
+        self.events += np.packbits(np.frombuffer(m.walls, dtype=np.uint8)).tobytes()
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        for v in (VERSION, self.cols, self.rows, self.count, len(self.events)):
+            _put(out, v)
+        return bytes(out + self.events + self.moves)
+
+    def save(self, path=None):
+        """Write the recording so far; returns the path (replay-<time>.replay by default)."""
+        if path is None:
+            path = time.strftime("replay-%Y%m%d-%H%M%S.replay")
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+        return path
+
+
+# ---------------------------
+# Playback
+# ---------------------------
+class Replay:
+    """A parsed recording: board size, the packed moves and the decoded events.
+
+    events is a list of (move, kind, payload), in order; an event applies
+    after that many moves.
+    """
+
+    def __init__(self, data):
+        if data[:4] != MAGIC:
+            raise ValueError("not a snake replay")
+        version, pos = _get(data, 4)
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        self.cols, pos = _get(data, pos)
+        self.rows, pos = _get(data, pos)
+        self.count, pos = _get(data, pos)
+        length, pos = _get(data, pos)
+        end = pos + length
+        self.moves = data[end:]
+        if len(self.moves) != (self.count + 3) >> 2:
+            raise ValueError("truncated replay")
+
+        size = self.cols * self.rows
+        wall_bytes = (size + 7) >> 3
+        self.events = events = []
+        at = 0
+        while pos < end:
+            delta, pos = _get(data, pos)
+            kind, pos = _get(data, pos)
+            at += delta
+            if kind == MAZE:
+                seed, pos = _get(data, pos)
+                style, pos = _get(data, pos)
+                bits = np.frombuffer(data, dtype=np.uint8, count=wall_bytes, offset=pos)
+                pos += wall_bytes
+                walls = bytearray(np.unpackbits(bits)[:size])
+                payload = (seed - 1 if seed else None, MAZE_STYLES[style], walls)
+            elif kind == SNAPSHOT:
+                payload = []
+                for _ in range(4):
+                    v, pos = _get(data, pos)
+                    payload.append(v)
+                body = []
+                for _ in range(payload[3]):
+                    v, pos = _get(data, pos)
+                    body.append(v)
+                payload[3] = body
+            elif kind in (FOOD, RESTART):
+                payload, pos = _get(data, pos)
+            else:
+                raise ValueError(f"unknown replay event {kind}")
+            events.append((at, kind, payload))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def direction(self, k):
+        """Index into vecenv.ACTIONS of move k."""
+        return (self.moves[k >> 2] >> ((k & 3) << 1)) & 3
+
+
+class Player:
+    """Re-applies a Replay to its own SnakeEngine, move by move.
+
+    t is the number of moves applied. Every `keyframe_every` moves the
+    state is kept, so seek() restores the nearest keyframe at or before the
+    target and only re-simulates from there. The engine reports events as
+    in a live game, so a front-end can draw and sound it unchanged.
+    """
+
+    def __init__(self, replay, keyframe_every=1000):
+        self.replay = replay
+        self.engine = SnakeEngine(replay.cols, replay.rows)
+        self.engine.auto_mode = False
+        self.keyframe_every = keyframe_every
+        self.keyframes = []  # (t, next event, state), ascending t
+        self.keyframe_times = []  # the keyframes' t, for bisect
+        self.t = 0
+        self.ev = 0
+        self._apply_events()
+        self._keyframe()
+
+    def __len__(self):
+        return self.replay.count
+
+    def _restore(self, maze_mode, snake, food, score):
+        e = self.engine
+        e.puzzle_mode = maze_mode
+        e.snake.clear()
+        e.snake.extend(snake)
+        e.restarts += 1
+        e.occ.reset(e.snake, walls=e.maze_walls if maze_mode else None)
+        e.food = food
+        e.score = score
+        e.planner.clear()
+
+    def _apply_events(self):
+        events, e = self.replay.events, self.engine
+        cell = e.board.cell
+        while self.ev < len(events) and events[self.ev][0] == self.t:
+            _, kind, payload = events[self.ev]
+            self.ev += 1
+            if kind == FOOD:
+                e.food = cell(payload - 1) if payload else None
+            elif kind == RESTART:
+                e.puzzle_mode = bool(payload)
+                if payload:
+                    e.setup_maze_play()
+                else:
+                    e.reset_normal()
+            elif kind == MAZE:
+                seed, e.maze_style, walls = payload
+                board = e.board
+                path = maze.solve(board, board.index(e.maze_start), board.index(e.maze_goal), walls) or []
+                e.install_maze(maze.Maze(walls, path, 1, 0.0, seed))
+            else:
+                mode, score, food, body = payload
+                self._restore(bool(mode), [cell(i) for i in body], cell(food - 1) if food else None, score)
+
+    def _keyframe(self):
+        e = self.engine
+        state = (e.puzzle_mode, tuple(e.snake), e.food, e.score, e.maze, e.maze_style)
+        self.keyframes.append((self.t, self.ev, state))
+        self.keyframe_times.append(self.t)
+
+    def step(self):
+        """Apply the next move and the events that follow it; False at the end."""
+        if self.t >= self.replay.count:
+            return False
+        e = self.engine
+        dx, dy = ACTIONS[self.replay.direction(self.t)]
+        hx, hy = e.snake[0]
+        nxt = (hx + dx, hy + dy)
+        wrapped = False
+        if not e.puzzle_mode:
+            nxt = (nxt[0] % e.cols, nxt[1] % e.rows)
+            wrapped = nxt != (hx + dx, hy + dy)
+        e.move(nxt)
+        if wrapped:
+            e.events.append((WRAP, nxt))
+        self.t += 1
+        self._apply_events()
+        if self.t % self.keyframe_every == 0 and self.t > self.keyframes[-1][0]:
+            self._keyframe()
+        return True
+
+    def run(self):
+        """Play to the end as fast as the CPU allows; returns the moves applied."""
+        start = self.t
+        events = self.engine.events
+        while self.step():
+            events.clear()
+        return self.t - start
+
+    def seek(self, t):
+        """Go to the state after move t (clamped to the recording)."""
+        t = max(0, min(t, self.replay.count))
+        k = bisect.bisect_right(self.keyframe_times, t) - 1
+        kt, ev, state = self.keyframes[k]
+        if not kt <= self.t <= t:
+            maze_mode, snake, food, score, m, style = state
+            e = self.engine
+            if m is not None and m is not e.maze:
+                e.maze_style = style
+                e.install_maze(m)
+            self.t, self.ev = kt, ev
+            self._restore(maze_mode, snake, food, score)
+        events = self.engine.events
+        while self.t < t and self.step():
+            if len(events) > 64:
+                del events[:-8]  # nobody drains them while seeking; keep the newest
+        return self.t
+
+
+# ---------------------------
+# Command line
+# ---------------------------
+WATCH_BLOCK = 22  # cell size in pixels, as in game.py
+WATCH_FPS = 60  # display frame cap
+MAX_WATCH_SPEED = 560.0  # moves per second, game.py's top speed
+
+
+def watch(player, speed):
+    """Play back in a window, drawn with game.py's look (render.BoardRenderer)."""
+    import pygame
+    from frontend import FixedStep
+    from render import BoardRenderer, DirtyRects, Hud
+
+    e = player.engine
+    pygame.init()
+    screen = pygame.display.set_mode((e.cols * WATCH_BLOCK, e.rows * WATCH_BLOCK))
+    board_view = BoardRenderer(e, DirtyRects(screen), WATCH_BLOCK)
+    hud = Hud(pygame.font.SysFont("Consolas", 20), (230, 230, 240))
+    clock = pygame.time.Clock()
+
+    clock_steps = FixedStep()
+    paused = False
+    running = True
+    while running:
+        clock_steps.add(clock.tick(WATCH_FPS) / 1000.0)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                if event.key == pygame.K_PAGEUP:
+                    speed = min(speed * 2, MAX_WATCH_SPEED)
+                if event.key == pygame.K_PAGEDOWN:
+                    speed = max(speed / 2, 1.0)
+                # LEFT/RIGHT seek by ten seconds of play at the current speed
+                if event.key == pygame.K_RIGHT:
+                    player.seek(player.t + int(speed * 10))
+                if event.key == pygame.K_LEFT:
+                    player.seek(player.t - int(speed * 10))
+        if paused:
+            clock_steps.backlog = 0.0
+        else:
+            for _ in range(clock_steps.steps(speed)):
+                if not player.step():
+                    paused = True
+                    break
+        e.events.clear()
+        pygame.display.set_caption(f"Replay - move {player.t}/{len(player)}" + (" (paused)" if paused else ""))
+        board_view.draw()
+        board_view.dirty.add(hud.draw(screen, (8, 8), "MAZE PLAY" if e.puzzle_mode else "NORMAL",
+                                      " | Score:", str(e.score), " | Moves/s:", f"{speed:.0f}"))
+        board_view.dirty.present()
+    pygame.quit()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("path")
+    ap.add_argument("--headless", action="store_true", help="re-simulate without a window and report")
+    ap.add_argument("--seek", type=int, default=0, help="start after this many moves")
+    ap.add_argument("--speed", type=float, default=14.0, help="moves per second when watching")
+    ap.add_argument("--keyframes", type=int, default=1000, help="moves between seek keyframes")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    replay = Replay.load(args.path)
+    player = Player(replay, args.keyframes)
+    player.seek(args.seek)
+    if not args.headless:
+        watch(player, args.speed)
+        return
+    player.run()
+    secs = time.perf_counter() - t0
+    e = player.engine
+    print(f"{args.path}: {os.path.getsize(args.path)} bytes, {len(player)} moves, "
+          f"{len(replay.events)} events, {replay.cols}x{replay.rows}", file=sys.stderr)
+    print(f"replayed in {secs * 1000:.1f} ms ({len(player) / max(secs, 1e-9):.0f} moves/s); "
+          f"ends in {'maze play' if e.puzzle_mode else 'normal mode'}, score {e.score}, "
+          f"length {len(e.snake)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Gym-style environment over engine.SnakeEngine for RL pipelines.
+
+    env = SnakeEnv(maze_mode=True)
+    obs, info = env.reset(seed=1)
+    obs, reward, terminated, truncated, info = env.step(3)  # right
+
+When gymnasium is installed SnakeEnv is a gymnasium.Env with matching
+spaces; without it the same reset()/step() API works on its own. pygame is
+only imported for render_mode "human" or "rgb_array", which draw the board
+with game.py's look (render.BoardRenderer), each env with its own
+renderer. "rgb_array" draws offscreen and needs no display; "human" envs
+share pygame's one window, which closes with the last of them.
+"""
+import numpy as np
+
+import engine as snake_engine
+from engine import SnakeEngine
+from vecenv import ACTIONS
+
+try:
+    import gymnasium as gym
+    from gymnasium import spaces
+except ImportError:  # optional: only needed for the spaces and env checkers
+    gym = None
+
+# observation planes
+WALLS, BODY, HEAD, FOOD = range(4)
+BLOCK = 22  # rendered cell size in pixels, as in game.py
+
+
+class SnakeEnv(gym.Env if gym else object):
+    """One snake board, driven by actions 0..3 = up, down, left, right.
+
+    Actions decode exactly like the arrow keys set manual_dir in the
+    games. The observation is a (4, rows, cols) uint8 array of 0/1 planes
+    (walls, body, head, food). It is allocated once and rewritten in place
+    by every reset()/step(), so copy it if you keep it. Reward is 1.0 per
+    food. An episode terminates when the board is full (maze play: when
+    it is cleared) and is truncated after max_steps.
+    """
+
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 14}
+
+    def __init__(self, cols=30, rows=20, maze_mode=False, maze_style=snake_engine.MAZE_STYLES[0],
+                 max_steps=5000, render_mode=None):
+        self.engine = SnakeEngine(cols, rows, maze_style=maze_style)
+        self.engine.auto_mode = False
+        self.maze_mode = maze_mode
+        self.max_steps = max_steps
+        self.render_mode = render_mode
+        self.steps = 0
+
+        self._obs = np.zeros((4, rows, cols), dtype=np.uint8)
+        # views over the engine's own buffers, nothing is copied per step
+        self._counts = np.frombuffer(self.engine.occ.cells, dtype=np.int32).reshape(rows, cols)
+        self._walls = np.frombuffer(self.engine.maze_walls, dtype=np.uint8).reshape(rows, cols)
+        self._body = np.zeros((rows, cols), dtype=np.int32)
+        self._view = None
+
+        if gym:
+            self.observation_space = spaces.Box(0, 1, self._obs.shape, dtype=np.uint8)
+            self.action_space = spaces.Discrete(len(ACTIONS))
+
+    def _observe(self):
+        e, obs = self.engine, self._obs
+        if e.puzzle_mode:
+            np.copyto(obs[WALLS], self._walls)
+            np.subtract(self._counts, self._walls, out=self._body)
+            np.greater(self._body, 0, out=obs[BODY])
+        else:
+            obs[WALLS].fill(0)
+            np.greater(self._counts, 0, out=obs[BODY])
+        obs[HEAD].fill(0)
+        hx, hy = e.snake[0]
+        obs[HEAD, hy, hx] = 1
+        obs[FOOD].fill(0)
+        if e.food is not None:
+            fx, fy = e.food
+            obs[FOOD, fy, fx] = 1
+        return obs
+
+    def _drain(self):
+        """Clear the engine's events; returns (food eaten, board finished)."""
+        eaten, finished = 0, False
+        for kind, _ in self.engine.events:
+            if kind == snake_engine.EAT:
+                eaten += 1
+            elif kind == snake_engine.CLEARED:
+                finished = True
+        self.engine.events.clear()
+        return eaten, finished
+
+    def _info(self):
+        return {"score": self.engine.score, "steps": self.steps}
+
+    def reset(self, seed=None, options=None):
+        if gym:
+            super().reset(seed=seed)
+        e = self.engine
+        if seed is not None:
+            e.rng.seed(seed)
+        self.steps = 0
+        e.set_puzzle_mode(self.maze_mode)
+        e.auto_mode = False
+        self._drain()
+        if self.render_mode == "human":
+            self.render()
+        return self._observe(), self._info()
+
+    def step(self, action):
+        e = self.engine
+        e.steer(ACTIONS[int(action)])
+        score = e.score
+        e.step()
+        self.steps += 1
+        eaten, cleared = self._drain()
+        # a cleared maze is already replaced by the next one (score back at
+        # 0), so the score is counted from before the step
+        terminated = cleared or e.food is None
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {"score": score + eaten, "steps": self.steps}
+        if self.render_mode == "human":
+            self.render()
+        return self._observe(), float(eaten), terminated, truncated, info
+
+    # ---------------------------
+    # Rendering
+    # ---------------------------
+    _windows = 0  # "human" envs holding pygame's display open
+
+    def render(self):
+        if self.render_mode is None:
+            return None
+        import pygame
+        from render import BoardRenderer, DirtyRects
+        view = self._view
+        if view is None:
+            size = (self.engine.cols * BLOCK, self.engine.rows * BLOCK)
+            if self.render_mode == "human":
+                pygame.display.init()
+                screen = pygame.display.set_mode(size)
+                SnakeEnv._windows += 1
+            else:
+                screen = pygame.Surface(size)
+            view = self._view = BoardRenderer(self.engine, DirtyRects(screen), BLOCK)
+        view.draw()
+        if self.render_mode == "rgb_array":
+            view.dirty.finish()
+            return pygame.surfarray.array3d(view.dirty.screen).swapaxes(0, 1)
+        view.dirty.present()
+        pygame.event.pump()
+        return None
+
+    def close(self):
+        self.engine.close()
+        if self._view is not None:
+            self._view = None
+            if self.render_mode == "human":
+                SnakeEnv._windows -= 1
+                if not SnakeEnv._windows:
+                    # only the display: pygame itself may be in use elsewhere
+                    import pygame
+                    pygame.display.quit()
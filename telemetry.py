@@ -0,0 +1,84 @@
+"""Per-search planner counters, aggregated per game and streamed as JSON lines.
+
+A SearchStats set as a planner's `stats` (pathfinding) or passed to
+maze.generate() gets one record() call per search: the search kind, cells
+expanded, the largest the open set (or BFS wavefront) grew, and the path
+length, None when the goal was unreachable. It keeps running totals for
+the current game, and with a sink every search and every finished game is
+written out as one JSON object per line:
+
+    stats = SearchStats(JsonlSink("telemetry.jsonl"))
+    engine.set_search_stats(stats)   # games end on every engine restart
+
+Nothing is counted where no SearchStats is set: the searches only keep a
+couple of local counters and skip the record() call.
+"""
+import json
+
+
+class JsonlSink:
+    """Appends JSON objects to a file, one per line."""
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class SearchStats:
+    """Totals of the searches since the last end_game(); per-search lines to `sink`."""
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.game = 0
+        self.last = None  # totals of the last game closed
+        self.reset()
+
+    def reset(self):
+        self.searches = 0
+        self.failed = 0
+        self.expanded = 0
+        self.max_expanded = 0
+        self.open_peak = 0
+        self.path_total = 0  # steps over the paths found
+
+    def record(self, kind, expanded, open_peak, path):
+        self.searches += 1
+        self.expanded += expanded
+        if expanded > self.max_expanded:
+            self.max_expanded = expanded
+        if open_peak > self.open_peak:
+            self.open_peak = open_peak
+        if path is None:
+            self.failed += 1
+        else:
+            self.path_total += path
+        if self.sink is not None:
+            self.sink.write({"type": "search", "game": self.game, "kind": kind, "expanded": expanded,
+                             "open_peak": open_peak, "path": path, "failed": path is None})
+
+    def totals(self):
+        return {
+            "searches": self.searches, "failed": self.failed,
+            "expanded": self.expanded, "max_expanded": self.max_expanded,
+            "open_peak": self.open_peak, "path_total": self.path_total,
+        }
+
+    def end_game(self, **info):
+        """Close the current game: returns its totals (plus info) and starts counting the next.
+
+        The totals also go to the sink. A game that ran no search is not
+        written and keeps its number for the next one.
+        """
+        totals = dict(info, **self.totals())
+        if self.searches:
+            if self.sink is not None:
+                self.sink.write(dict(type="game", game=self.game, **totals))
+            self.game += 1
+            self.last = totals
+            self.reset()
+        return totals
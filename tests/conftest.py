@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules live flat in the repo root, next to the games
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
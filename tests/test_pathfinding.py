@@ -0,0 +1,129 @@
+"""The incremental planners against fresh A* searches."""
+import random
+
+import pytest
+
+from grid import Grid, Occupancy
+from pathfinding import DStarLite, PathCache, search
+
+
+def free_cell(r, occ, grid):
+    while True:
+        i = r.randrange(grid.size)
+        if occ.cells[i] == 0:
+            return i
+
+
+def walk(planner_type, seed, wrap, ticks=400):
+    """A snake follows a planner on a board whose obstacles come and go.
+
+    Yields (planner, head, goal, blocked, step) for every tick, before the
+    snake takes the step.
+    """
+    r = random.Random(seed)
+    grid = Grid(r.randrange(12, 25), r.randrange(12, 25))
+    occ = Occupancy(grid)
+    walls = bytearray(grid.size)
+    for i in r.sample(range(grid.size), grid.size // 8):
+        walls[i] = 1
+    occ.reset([], walls=walls)
+    snake = [free_cell(r, occ, grid)]
+    occ.push(snake[0])
+    obstacles = [i for i in range(grid.size) if walls[i]]
+    goal = free_cell(r, occ, grid)
+    planner = planner_type(grid, wrap=wrap)
+
+    for _ in range(ticks):
+        head, tail = snake[0], snake[-1]
+        blocked = occ.except_tail(tail)
+        step = planner.next_step(head, goal, blocked)
+        yield planner, head, goal, blocked, step
+
+        if step < 0 or step == goal:
+            # eaten or cut off: grow towards a new goal
+            if step == goal:
+                snake.insert(0, step)
+                occ.push(step)
+                planner.cells_changed(step)
+            goal = free_cell(r, occ, grid)
+        else:
+            snake.insert(0, step)
+            occ.push(step)
+            occ.pop(snake.pop())
+            planner.cells_changed(step, tail)
+
+        # obstacles appear and vanish next to the snake's moves
+        for _ in range(r.randrange(3)):
+            if obstacles and r.random() < 0.5:
+                i = obstacles.pop(r.randrange(len(obstacles)))
+                occ.pop(i)
+            else:
+                i = free_cell(r, occ, grid)
+                if i == goal:
+                    continue
+                occ.push(i)
+                obstacles.append(i)
+            planner.cells_changed(i)
+
+
+def check_step(planner, head, goal, blocked, step, wrap):
+    """Fresh search() paths from head and from step; asserts the step is legal."""
+    grid = planner.grid
+    best = search(grid, head, goal, blocked, wrap)
+    if best is None:
+        assert step == -1
+        return None, None
+    assert step in grid.neighbours(wrap)[head << 2:(head << 2) + 4]
+    assert not blocked[step]
+    rest = search(grid, step, goal, blocked, wrap)
+    assert rest is not None
+    return best, rest
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+@pytest.mark.parametrize("seed", range(8))
+def test_dstar_steps_lie_on_shortest_paths(seed, wrap):
+    """Every D* Lite step is one cell closer to the goal by a fresh search(),
+    and D* Lite gives up exactly when search() finds no path."""
+    checked = 0
+    for planner, head, goal, blocked, step in walk(DStarLite, seed, wrap):
+        best, rest = check_step(planner, head, goal, blocked, step, wrap)
+        if best is not None:
+            assert len(rest) == len(best) - 1
+            checked += 1
+    assert checked > 100
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_path_cache_drops_blocked_paths(seed, wrap):
+    """A cached A* path is dropped once an obstacle lands on it, so a step
+    never enters a blocked cell and the goal stays reachable from it."""
+    for planner, head, goal, blocked, step in walk(PathCache, seed, wrap):
+        check_step(planner, head, goal, blocked, step, wrap)
+    assert planner.hits > 100  # most ticks still walk the cached path
+
+
+class Records(list):
+    """Stands in for telemetry.SearchStats: keeps what search() reports."""
+
+    def record(self, kind, expanded, open_peak, path):
+        self.append((kind, expanded, open_peak, path))
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_counted_search_matches_search(wrap):
+    """search() with stats (the counting copy of its loop) finds the very
+    same paths as without, and reports one record per search."""
+    stats = Records()
+    searches = 0
+    for seed in range(4):
+        for planner, head, goal, blocked, step in walk(DStarLite, seed, wrap, ticks=100):
+            path = search(planner.grid, head, goal, blocked, wrap)
+            assert search(planner.grid, head, goal, blocked, wrap, stats) == path
+            if head != goal:
+                searches += 1
+                kind, expanded, peak, length = stats[-1]
+                assert length == (None if path is None else len(path))
+                assert expanded >= (1 if path is None else len(path)) and peak >= 1
+    assert len(stats) == searches
@@ -0,0 +1,86 @@
+"""Recorder -> file -> Player round trips over seeded, steered games."""
+import random
+
+import pytest
+
+import engine as snake_engine
+from engine import SnakeEngine
+from replay import Player, Recorder, Replay
+from vecenv import ACTIONS
+
+
+def state(e):
+    walls = bytes(e.maze_walls) if e.puzzle_mode else None
+    return e.puzzle_mode, tuple(e.snake), e.food, e.score, walls
+
+
+def record(seed, ops=1500):
+    """Play a seeded game with mode switches, maze restarts and steering.
+
+    Returns the recording's bytes and {move count: state after it}.
+    """
+    r = random.Random(seed)
+    styles, planners = snake_engine.MAZE_STYLES, snake_engine.PLANNER_NAMES
+    e = SnakeEngine(30, 20, seed=seed, maze_style=styles[seed % len(styles)],
+                    planner=planners[seed % len(planners)])
+    if seed % 2:
+        e.set_puzzle_mode(True)
+    for _ in range(r.randrange(50)):  # start recording mid-game
+        e.step()
+    rec = Recorder(e)
+    trace = {rec.count: state(e)}
+    for _ in range(ops):
+        x = r.random()
+        if x < 0.004:
+            e.set_puzzle_mode(not e.puzzle_mode)
+        elif x < 0.008:
+            e.reset()  # a new maze in maze play
+        elif x < 0.01:
+            e.cycle_maze_style()
+        elif x < 0.025:
+            e.auto_mode = not e.auto_mode
+        elif x < 0.07:
+            e.steer(ACTIONS[r.randrange(4)])
+        else:
+            e.step()
+        e.events.clear()
+        trace[rec.count] = state(e)
+    e.close()
+    return rec.to_bytes(), trace
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_playback_matches_recording(seed):
+    data, trace = record(seed)
+    player = Player(Replay(data), keyframe_every=97)
+    assert state(player.engine) == trace[0]
+    while player.step():
+        player.engine.events.clear()
+        if player.t in trace:
+            assert state(player.engine) == trace[player.t], player.t
+    assert player.t == len(player) == max(trace)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_seek_matches_recording(seed):
+    data, trace = record(seed)
+    player = Player(Replay(data), keyframe_every=97)
+    player.run()  # every keyframe exists
+    r = random.Random(seed)
+    for t in r.sample(sorted(trace), 40):
+        player.seek(t)
+        assert state(player.engine) == trace[t], t
+    # and from a fresh player, which only has the keyframes it has passed
+    player = Player(Replay(data), keyframe_every=97)
+    for t in sorted(r.sample(sorted(trace), 10), reverse=True):
+        player.seek(t)
+        assert state(player.engine) == trace[t], t
+
+
+def test_save_and_load(tmp_path):
+    data, trace = record(3, ops=300)
+    path = tmp_path / "run.replay"
+    path.write_bytes(data)
+    player = Player(Replay.load(str(path)))
+    player.run()
+    assert state(player.engine) == trace[player.t]
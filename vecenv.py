@@ -0,0 +1,169 @@
+"""N snake boards stepped together in NumPy, for training and evaluating controllers.
+
+Same rules as engine.SnakeEngine under manual control: normal mode wraps
+around the edges and the snake may cross itself; in maze play a move into
+a wall or off the board is refused and the snake stays put. Every board is
+a row of a few (N, cells) arrays, so one step() call advances all of them
+with a fixed number of array operations, whatever N is.
+"""
+import numpy as np
+
+import maze
+from grid import Grid
+
+# actions 0..3 = up, down, left, right
+ACTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+_DX = np.array([d[0] for d in ACTIONS], dtype=np.int32)
+_DY = np.array([d[1] for d in ACTIONS], dtype=np.int32)
+MAZE_STYLES = list(maze.STYLES)
+
+
+class VecSnakeEnv:
+    """n boards of cols x rows, all in normal mode or all in maze play.
+
+    Per board: `occ` counts the segments on each cell (maze walls add one,
+    like grid.Occupancy), `walls` is the wall mask, the body is a ring
+    buffer of cell indices in `ring` with the head at ring[i, head[i]] and
+    `length` segments behind it, and `food` is a cell index (-1 when the
+    board is full). step() returns (reward, done): reward is 1.0 where food
+    was eaten, done is set where the board filled up. With auto_reset those
+    boards start a new episode (a new maze in maze play) right away, and
+    `final_score` keeps the score each board finished its last episode on.
+    """
+
+    def __init__(self, n, cols=30, rows=20, maze_mode=False, maze_style=MAZE_STYLES[0],
+                 seed=None, auto_reset=True):
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        self.size = size = cols * rows
+        self.maze_mode = maze_mode
+        self.maze_style = maze_style
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+        self.grid = Grid(cols, rows)
+        self.maze_start = (1, 1)
+        self.maze_goal = (cols - 2, rows - 2)
+
+        self.occ = np.zeros((n, size), dtype=np.int16)
+        self.walls = np.zeros((n, size), dtype=np.uint8)
+        # one slot more than cells, so a body as long as the board still has
+        # its tail in the ring while the new head is written
+        self.ring = np.zeros((n, size + 1), dtype=np.int32)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.food = np.full(n, -1, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self._rows = np.arange(n)
+        self.reset()
+
+    # ---------------------------
+    # Episodes
+    # ---------------------------
+    def reset(self, envs=None):
+        """Start new episodes on the given boards (all by default)."""
+        envs = self._rows if envs is None else np.asarray(envs, dtype=np.int64)
+        if not envs.size:
+            return
+        grid, cols, rows = self.grid, self.cols, self.rows
+        self.occ[envs] = 0
+        self.walls[envs] = 0
+        self.head[envs] = 0
+        self.score[envs] = 0
+        self.steps[envs] = 0
+        if self.maze_mode:
+            start, goal = grid.index(self.maze_start), grid.index(self.maze_goal)
+            sx = self.maze_start[0]
+            for e in envs.tolist():
+                m = maze.generate(self.maze_style, grid, start, goal, int(self.rng.integers(2**32)))
+                walls = np.frombuffer(m.walls, dtype=np.uint8)
+                self.walls[e] = walls
+                body = [start]
+                if sx+1 < cols and not walls[start + 1]:
+                    body.append(start + 1)
+                self._place_body(e, body)
+            self.occ[envs] += self.walls[envs]
+        else:
+            body = [grid.index((cols//4 - k, rows//2)) for k in range(3)]
+            for e in envs.tolist():
+                self._place_body(e, body)
+        self._place_food(envs)
+
+    def _place_body(self, e, body):
+        # ring holds tail .. head at slots 0 .. len-1
+        k = len(body)
+        self.ring[e, :k] = body[::-1]
+        self.head[e] = k - 1
+        self.length[e] = k
+        np.add.at(self.occ[e], body, 1)
+
+    def _place_food(self, envs):
+        """Uniform random free cell on each board in envs, -1 if none is free."""
+        occ, rng, size = self.occ, self.rng, self.size
+        todo = envs
+        # rejection sampling settles nearly every board in a few rounds
+        for _ in range(8):
+            cand = rng.integers(0, size, len(todo))
+            ok = occ[todo, cand] == 0
+            self.food[todo[ok]] = cand[ok]
+            todo = todo[~ok]
+            if not todo.size:
+                return
+        # crowded boards: the free cell with the largest random key
+        free = occ[todo] == 0
+        keys = rng.random(free.shape) * free
+        cell = keys.argmax(axis=1)
+        self.food[todo] = np.where(free[np.arange(len(todo)), cell], cell, -1)
+
+    # ---------------------------
+    # Stepping
+    # ---------------------------
+    def heads(self):
+        return self.ring[self._rows, self.head]
+
+    def step(self, actions):
+        """Move every snake by its action (0..3 = up, down, left, right)."""
+        a = np.asarray(actions)
+        cols, rows, size = self.cols, self.rows, self.size
+        cap = size + 1
+        rows_idx = self._rows
+        cur = self.ring[rows_idx, self.head]
+        nx = cur % cols + _DX[a]
+        ny = cur // cols + _DY[a]
+        if self.maze_mode:
+            inside = (nx >= 0) & (nx < cols) & (ny >= 0) & (ny < rows)
+            nxt = np.where(inside, ny * cols + nx, 0)
+            move = inside & (self.walls[rows_idx, nxt] == 0)
+        else:
+            nxt = (ny % rows) * cols + nx % cols
+            move = np.ones(self.n, dtype=bool)
+
+        e = np.flatnonzero(move)
+        to = nxt[e]
+        hp = (self.head[e] + 1) % cap
+        self.head[e] = hp
+        self.ring[e, hp] = to
+        self.occ[e, to] += 1
+        ate = to == self.food[e]
+        # drop the tail where nothing was eaten
+        p, hp_p = e[~ate], hp[~ate]
+        tail = self.ring[p, (hp_p - self.length[p]) % cap]
+        self.occ[p, tail] -= 1
+        grew = e[ate]
+        self.length[grew] += 1
+        self.score[grew] += 1
+        self.steps[e] += 1
+
+        reward = np.zeros(self.n, dtype=np.float32)
+        reward[grew] = 1.0
+        self._place_food(grew)
+        done = np.zeros(self.n, dtype=bool)
+        done[grew] = (self.food[grew] < 0) | (self.length[grew] >= size)
+        if done.any():
+            finished = np.flatnonzero(done)
+            self.final_score[finished] = self.score[finished]
+            if self.auto_reset:
+                self.reset(finished)
+        return reward, done